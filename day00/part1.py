@@ -31,8 +31,13 @@ def test(input_s: str, expected: int) -> None:
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
         print(compute(f.read()))
 
@@ -1,5 +1,5 @@
 import argparse
-from collections import deque
+from collections.abc import Iterable
 from pathlib import Path
 
 import pytest
@@ -21,20 +21,25 @@ L82
 """
 EXPECTED = 3
 
+DIAL_SIZE = 100
+START = 50
 
-def compute(s: str) -> int:
-    dial = deque(range(100))
+
+def compute_stream(lines: Iterable[str]) -> int:
+    position = START
     total = 0
-    dial.rotate(50)
-    for line in s.splitlines():
+    for line in lines:
         direction, distance = line[0], int(line[1:])
-        dial.rotate(distance if direction == 'L' else -distance)
-        if dial[0] == 0:
-            total += 1
+        position = (position + (-distance if direction == 'L' else distance)) % DIAL_SIZE
+        total += position == 0
 
     return total
 
 
+def compute(s: str) -> int:
+    return compute_stream(s.splitlines())
+
+
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
@@ -47,10 +52,15 @@ def test(input_s: str, expected: int) -> None:
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
-    with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
+    with support.open_lines(args.data_file) as lines, support.timing():
+        print(compute_stream(lines))
 
     return 0
 
@@ -1,5 +1,5 @@
 import argparse
-from collections import deque
+from collections.abc import Iterable
 from pathlib import Path
 
 import pytest
@@ -21,21 +21,27 @@ L82
 """
 EXPECTED = 6
 
+DIAL_SIZE = 100
+START = 50
 
-def compute(s: str) -> int:
-    dial = deque(range(100))
+
+def compute_stream(lines: Iterable[str]) -> int:
+    position = START
     total = 0
-    dial.rotate(50)
-    for line in s.splitlines():
+    for line in lines:
         direction, distance = line[0], int(line[1:])
-        for _ in range(distance):
-            dial.rotate(-1 if direction == 'L' else 1)
-            if dial[0] == 0:
-                total += 1
+        # clicks already made past the last zero, counted in the turning direction
+        from_zero = (DIAL_SIZE - position) % DIAL_SIZE if direction == 'L' else position
+        total += (from_zero + distance) // DIAL_SIZE
+        position = (position + (-distance if direction == 'L' else distance)) % DIAL_SIZE
 
     return total
 
 
+def compute(s: str) -> int:
+    return compute_stream(s.splitlines())
+
+
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
@@ -48,10 +54,15 @@ def test(input_s: str, expected: int) -> None:
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
-    with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
+    with support.open_lines(args.data_file) as lines, support.timing():
+        print(compute_stream(lines))
 
     return 0
 
@@ -1,4 +1,5 @@
 import argparse
+import itertools
 from collections.abc import Generator
 from pathlib import Path
 
@@ -23,19 +24,30 @@ def range_gen(s: str) -> Generator[range]:
         yield range(int(low), int(high) + 1)
 
 
-def compute(s: str) -> int:
+def series_sum(first: int, last: int) -> int:
+    return (first + last) * (last - first + 1) // 2
+
+
+def doubled_sum(low: int, high: int) -> int:
+    """Sum all n in [low, high] made of some block written twice, e.g. 6464.
+
+    A doubled k-digit block b is b * (10^k + 1), so each k contributes
+    an arithmetic series of blocks instead of a scan over the range.
+    """
     total = 0
-    for _range in range_gen(s):
-        for n in _range:
-            num_s = str(n)
-            str_len = len(num_s)
-            left = num_s[: str_len // 2]
-            right = num_s[str_len // 2 :]
-            if left == right:
-                total += n
+    for k in range(1, len(str(high)) // 2 + 1):
+        multiplier = 10**k + 1
+        first = max(10 ** (k - 1), -(-low // multiplier))
+        last = min(10**k - 1, high // multiplier)
+        if first <= last:
+            total += multiplier * series_sum(first, last)
     return total
 
 
+def compute(s: str) -> int:
+    return sum(doubled_sum(_range.start, _range.stop - 1) for _range in range_gen(s))
+
+
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
@@ -45,11 +57,40 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+def brute_force_sum(low: int, high: int) -> int:
+    total = 0
+    for n in range(low, high + 1):
+        num_s = str(n)
+        half = len(num_s) // 2
+        if num_s[:half] == num_s[half:]:
+            total += n
+    return total
+
+
+def test_brute_force() -> None:
+    assert doubled_sum(1, 2_000_000) == brute_force_sum(1, 2_000_000)
+
+
+def test_wide_range() -> None:
+    low, high = 12_345, 10**20 + 12_345
+    # pieces split at every new digit length, where blocks change size
+    cuts = [low, *(10**k for k in range(5, 21)), high + 1]
+    pieces = sum(doubled_sum(a, b - 1) for a, b in itertools.pairwise(cuts))
+    assert doubled_sum(low, high) == pieces
+    for cut in cuts[1:-1]:
+        assert doubled_sum(cut - 5000, cut + 5000) == brute_force_sum(cut - 5000, cut + 5000)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
         print(compute(f.read()))
 
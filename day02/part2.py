@@ -1,4 +1,5 @@
 import argparse
+import itertools
 import re
 from collections.abc import Generator
 from pathlib import Path
@@ -24,16 +25,40 @@ def range_gen(s: str) -> Generator[range]:
         yield range(int(low), int(high) + 1)
 
 
-def compute(s: str) -> int:
+def series_sum(first: int, last: int) -> int:
+    return (first + last) * (last - first + 1) // 2
+
+
+def period_sum(low: int, high: int, length: int, period: int) -> int:
+    """Sum `length`-digit n in [low, high] made of a `period`-digit block repeated."""
+    # block * 1..01..01 (repunit in base 10^period)
+    multiplier = (10**length - 1) // (10**period - 1)
+    first = max(10 ** (period - 1), -(-low // multiplier))
+    last = min(10**period - 1, high // multiplier)
+    return multiplier * series_sum(first, last) if first <= last else 0
+
+
+def repeated_sum(low: int, high: int) -> int:
+    """Sum all n in [low, high] made of some block repeated at least twice.
+
+    111111 repeats '1', '11' and '111', so per length only numbers whose
+    *shortest* block has each period are added (inclusion-exclusion over divisors).
+    """
     total = 0
-    pattern = r'^(\d+)(\1)+$'
-    for _range in range_gen(s):
-        for n in _range:
-            if re.match(pattern, str(n)):
-                total += n
+    for length in range(2, len(str(high)) + 1):
+        periods = [d for d in range(1, length) if length % d == 0]
+        shortest: dict[int, int] = {}
+        for d in periods:
+            shorter = sum(shortest[p] for p in periods if p < d and d % p == 0)
+            shortest[d] = period_sum(low, high, length, d) - shorter
+        total += sum(shortest.values())
     return total
 
 
+def compute(s: str) -> int:
+    return sum(repeated_sum(_range.start, _range.stop - 1) for _range in range_gen(s))
+
+
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
@@ -43,11 +68,34 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+def brute_force_sum(low: int, high: int) -> int:
+    return sum(n for n in range(low, high + 1) if re.match(r'^(\d+)(\1)+$', str(n)))
+
+
+def test_brute_force() -> None:
+    assert repeated_sum(1, 2_000_000) == brute_force_sum(1, 2_000_000)
+
+
+def test_wide_range() -> None:
+    low, high = 12_345, 10**20 + 12_345
+    # pieces split at every new digit length, where blocks change size
+    cuts = [low, *(10**k for k in range(5, 21)), high + 1]
+    pieces = sum(repeated_sum(a, b - 1) for a, b in itertools.pairwise(cuts))
+    assert repeated_sum(low, high) == pieces
+    for cut in cuts[1:-1]:
+        assert repeated_sum(cut - 5000, cut + 5000) == brute_force_sum(cut - 5000, cut + 5000)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
         print(compute(f.read()))
 
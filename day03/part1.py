@@ -1,4 +1,5 @@
 import argparse
+from collections.abc import Iterable
 from pathlib import Path
 
 import pytest
@@ -15,37 +16,24 @@ INPUT_S = """\
 """
 EXPECTED = 357
 
+TARGET_DIGITS = 2
 
-# 1111121111151111
 
-
-def largest_two_digit(s: str) -> int:
-    digits = [int(c) for c in s]
-    n = len(digits)
-
-    def best(i: int) -> int:
-        if i >= n - 1:  # not enough digits left
-            return 0
-
-        # 1. take digits[i] as tens digit → pair with every later digit
-        with_current = max(10 * digits[i] + digits[j] for j in range(i + 1, n))
-
-        # 2. skip digits[i] entirely
-        without_current = best(i + 1)
-
-        return max(with_current, without_current)
-
-    return best(0)
+def compute_stream(lines: Iterable[str]) -> int:
+    return sum(support.largest_subsequence_number(line.encode(), TARGET_DIGITS) for line in lines)
 
 
 def compute(s: str) -> int:
-    return sum(largest_two_digit(line) for line in s.splitlines())
+    return compute_stream(s.splitlines())
 
 
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
-    [(INPUT_S, EXPECTED)],
+    [
+        (INPUT_S, EXPECTED),
+        ('1' * 100_000 + '98\n', 98),  # deeper than the recursion limit
+    ],
 )
 def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
@@ -54,10 +42,15 @@ def test(input_s: str, expected: int) -> None:
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
-    with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
+    with support.open_lines(args.data_file) as lines, support.timing():
+        print(compute_stream(lines))
 
     return 0
 
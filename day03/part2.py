@@ -1,5 +1,5 @@
 import argparse
-from collections import deque
+from collections.abc import Iterable
 from pathlib import Path
 
 import pytest
@@ -16,30 +16,15 @@ INPUT_S = """\
 """
 EXPECTED = 3121910778619
 
-MAX_BATTERY_VALUE = 9
 TARGET_DIGITS = 12
 
 
-def largest_12_digit_number(s: str) -> int:
-    batteries = list(map(int, s))
-    queue: deque[int] = deque()
-    result, count = 0, 0
-    for idx, battery in enumerate(batteries):
-        while queue and queue[-1] < battery:
-            queue.pop()
-
-        queue.append(battery)
-        if queue[0] == MAX_BATTERY_VALUE or len(batteries) - idx == TARGET_DIGITS - count:
-            count += 1
-            result += pow(10, TARGET_DIGITS - count) * queue.popleft()
-
-            if count == TARGET_DIGITS:
-                break
-    return result
+def compute_stream(lines: Iterable[str]) -> int:
+    return sum(support.largest_subsequence_number(line.encode(), TARGET_DIGITS) for line in lines)
 
 
 def compute(s: str) -> int:
-    return sum(largest_12_digit_number(line) for line in s.splitlines())
+    return compute_stream(s.splitlines())
 
 
 # @pytest.mark.solved
@@ -51,13 +36,25 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+def test_many_digits() -> None:
+    # more digits than int() converts from a string by default
+    digits = b'1' * 3000 + b'9' * 5000 + b'8' * 3000
+    expected = (10**5000 - 1) * 10**3000 + (10**3000 - 1) * 8 // 9
+    assert support.largest_subsequence_number(digits, 8000) == expected
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
-    with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
+    with support.open_lines(args.data_file) as lines, support.timing():
+        print(compute_stream(lines))
 
     return 0
 
@@ -1,11 +1,14 @@
 import argparse
-import contextlib
+from collections.abc import Callable
+from collections.abc import Iterable
 from pathlib import Path
+from typing import Literal
 
+import numpy as np
 import pytest
 import support
-from support import adjacent_8
-from support import parse_coords_char
+from support import DenseGrid
+from support import adjacent_counts
 
 INPUT_TXT = Path(__file__).parent / 'input.txt'
 
@@ -28,18 +31,9 @@ MIN_ADJACENT_THRESHOLD = 4
 
 
 def compute(s: str) -> int:
-    total = 0
-    grid = parse_coords_char(s)
-    for coord in grid:
-        if grid[coord] == '.':
-            continue
-        around_this = 0
-        for adj_coord in adjacent_8(*coord):
-            with contextlib.suppress(KeyError):
-                around_this += grid[adj_coord] == '@'
-        total += around_this < MIN_ADJACENT_THRESHOLD
-
-    return total
+    rolls = DenseGrid.from_string(s).mask('@')
+    accessible = rolls & (adjacent_counts(rolls) < MIN_ADJACENT_THRESHOLD)
+    return int(np.count_nonzero(accessible))
 
 
 # @pytest.mark.solved
@@ -51,11 +45,34 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+@pytest.mark.parametrize(
+    ('connectivity', 'adjacent'),
+    [(4, support.adjacent_4), (8, support.adjacent_8)],
+)
+def test_adjacent_counts(
+    connectivity: Literal[4, 8],
+    adjacent: Callable[[int, int], Iterable[tuple[int, int]]],
+) -> None:
+    # not square, so swapped axes would show
+    rolls = DenseGrid.from_string(INPUT_S).mask('@')[:6, :9]
+    coords = {(int(x), int(y)) for y, x in zip(*np.nonzero(rolls), strict=True)}
+    height, width = rolls.shape
+    expected = [
+        [sum(pt in coords for pt in adjacent(x, y)) for x in range(width)] for y in range(height)
+    ]
+    assert adjacent_counts(rolls, connectivity=connectivity).tolist() == expected
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
         print(compute(f.read()))
 
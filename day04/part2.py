@@ -1,11 +1,14 @@
 import argparse
-import contextlib
+from collections.abc import Callable
 from pathlib import Path
 
+import numpy as np
+import numpy.typing as npt
 import pytest
 import support
+from support import DenseGrid
 from support import adjacent_8
-from support import parse_coords_char
+from support import adjacent_counts
 
 INPUT_TXT = Path(__file__).parent / 'input.txt'
 
@@ -27,36 +30,63 @@ EXPECTED = 43
 MIN_ADJACENT_THRESHOLD = 4
 
 
-def do_step(
-    grid: dict[tuple[int, int], str],
-) -> tuple[dict[tuple[int, int], str], set[tuple[int, int]]]:
-    to_remove = set()
-    for coord, value in grid.items():
-        if value != '@':
-            continue
-        around_this = 0
-        for adj_coord in adjacent_8(*coord):
-            with contextlib.suppress(KeyError):
-                around_this += grid[adj_coord] == '@'
-        if around_this < MIN_ADJACENT_THRESHOLD:
-            to_remove.add(coord)
+def do_step(rolls: npt.NDArray[np.bool_]) -> int:
+    """Remove every accessible roll in place, return how many were removed."""
+    to_remove = rolls & (adjacent_counts(rolls) < MIN_ADJACENT_THRESHOLD)
+    rolls &= ~to_remove
+    return int(np.count_nonzero(to_remove))
 
-    for c in to_remove:
-        grid.pop(c)
 
-    return grid, to_remove
+def rescan_trace(rolls: npt.NDArray[np.bool_]) -> list[int]:
+    """Count rolls removed per round, recounting the whole grid every round."""
+    trace = []
+    while removed := do_step(rolls):
+        trace.append(removed)
+    return trace
 
 
-def compute(s: str) -> int:
-    total = 0
-    grid = parse_coords_char(s)
-    removed: set[tuple[int, int]] = {(0, 0)}  # dummy value to start the loop
+def frontier_trace(rolls: npt.NDArray[np.bool_]) -> list[int]:
+    """Count rolls removed per round, only revisiting neighbours of removed rolls.
 
-    while removed:
-        grid, removed = do_step(grid)
-        total += len(removed)
+    Counts only ever drop, so a roll becomes accessible exactly when a removal
+    pushes its count below the threshold -> O(cells) total work.
+    """
+    # pad by one so neighbour indices never leave the flat arrays
+    stride = rolls.shape[1] + 2
+    offsets = [dy * stride + dx for dx, dy in adjacent_8(0, 0)]
+    present = np.pad(rolls, 1).ravel().tolist()
+    counts = np.pad(adjacent_counts(rolls), 1).ravel().tolist()
+    accessible = np.pad(rolls & (adjacent_counts(rolls) < MIN_ADJACENT_THRESHOLD), 1)
+    frontier = np.flatnonzero(accessible).tolist()
 
-    return total
+    trace = []
+    while frontier:
+        trace.append(len(frontier))
+        for i in frontier:
+            present[i] = False
+
+        next_frontier = []
+        for i in frontier:
+            for offset in offsets:
+                j = i + offset
+                if present[j]:
+                    counts[j] -= 1
+                    if counts[j] == MIN_ADJACENT_THRESHOLD - 1:
+                        next_frontier.append(j)
+        frontier = next_frontier
+
+    return trace
+
+
+ENGINES: dict[str, Callable[[npt.NDArray[np.bool_]], list[int]]] = {
+    'frontier': frontier_trace,
+    'rescan': rescan_trace,
+}
+
+
+def compute(s: str, engine: str = 'frontier') -> int:
+    rolls = DenseGrid.from_string(s).mask('@')
+    return sum(ENGINES[engine](rolls))
 
 
 # @pytest.mark.solved
@@ -68,13 +98,26 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+def test_engines_agree_per_round() -> None:
+    rolls = DenseGrid.from_string(INPUT_S).mask('@')
+    assert (
+        frontier_trace(rolls.copy()) == rescan_trace(rolls.copy()) == [13, 12, 7, 5, 2, 1, 1, 1, 1]
+    )
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    parser.add_argument('--engine', choices=ENGINES, default='frontier')
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text(), args.engine)
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+        print(compute(f.read(), args.engine))
 
     return 0
 
@@ -1,8 +1,10 @@
 import argparse
 from pathlib import Path
 
+import numpy as np
 import pytest
 import support
+from support import IntervalSet
 
 INPUT_TXT = Path(__file__).parent / 'input.txt'
 
@@ -25,17 +27,10 @@ EXPECTED = 3
 
 def compute(s: str) -> int:
     ranges_s, ingredients_s = s.split('\n\n')
-    ranges = {tuple(map(int, num_range.split('-'))) for num_range in ranges_s.splitlines()}
-    ingredients = set(map(int, ingredients_s.splitlines()))
+    fresh = IntervalSet.from_string(ranges_s)
+    ingredients = list(set(map(int, ingredients_s.splitlines())))
 
-    total = 0
-    for ing in ingredients:
-        for rng in ranges:
-            if rng[0] <= ing <= rng[1]:
-                total += 1
-                break
-
-    return total
+    return int(np.count_nonzero(fresh.contains_many(ingredients)))
 
 
 # @pytest.mark.solved
@@ -47,11 +42,25 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+def test_contains_many_boundaries() -> None:
+    fresh = IntervalSet([(3, 5), (10, 14), (16, 20), (12, 18)])
+    values = [2, 3, 5, 6, 9, 10, 14, 15, 16, 20, 21]
+    expected = [False, True, True, False, False, True, True, True, True, True, False]
+    assert fresh.contains_many(values).tolist() == expected
+    assert [n in fresh for n in values] == expected
+    assert not IntervalSet([]).contains_many(values).any()
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
         print(compute(f.read()))
 
@@ -3,6 +3,7 @@ from pathlib import Path
 
 import pytest
 import support
+from support import IntervalSet
 
 INPUT_TXT = Path(__file__).parent / 'input.txt'
 
@@ -25,24 +26,7 @@ EXPECTED = 14
 
 def compute(s: str) -> int:
     ranges_s, _ingredients = s.split('\n\n')
-
-    ranges = [tuple(map(int, num_range.split('-'))) for num_range in ranges_s.splitlines()]
-
-    # Sort by start position
-    ranges.sort()
-
-    # Merge overlapping intervals
-    merged: list[tuple[int, int]] = []
-    for start, end in ranges:
-        if merged and start <= merged[-1][1] + 1:
-            # Overlaps or touches previous interval
-            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
-        else:
-            # No overlap, add new interval
-            merged.append((start, end))
-
-    # Count total numbers (inclusive ranges)
-    return sum(end - start + 1 for start, end in merged)
+    return IntervalSet.from_string(ranges_s).size
 
 
 # @pytest.mark.solved
@@ -54,11 +38,41 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+@pytest.mark.parametrize(
+    ('intervals', 'expected'),
+    [
+        pytest.param([(1, 3), (4, 5)], [(1, 5)], id='touching'),
+        pytest.param([(1, 3), (5, 6)], [(1, 3), (5, 6)], id='gap'),
+        pytest.param([(4, 9), (1, 5)], [(1, 9)], id='overlapping'),
+        pytest.param([(1, 9), (3, 4)], [(1, 9)], id='nested'),
+        pytest.param([(7, 7), (7, 7)], [(7, 7)], id='duplicate'),
+        pytest.param([], [], id='empty'),
+    ],
+)
+def test_interval_set_merges(
+    intervals: list[tuple[int, int]],
+    expected: list[tuple[int, int]],
+) -> None:
+    merged = IntervalSet(intervals)
+    assert list(merged) == expected
+    assert merged.size == sum(end - start + 1 for start, end in expected)
+
+
+def test_interval_set_rejects_reversed() -> None:
+    with pytest.raises(ValueError, match='ends before it starts: 5-3'):
+        IntervalSet([(1, 2), (5, 3)])
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
         print(compute(f.read()))
 
@@ -1,9 +1,10 @@
 import argparse
-import functools
-from operator import add
-from operator import mul
+import math
+from collections.abc import Callable
+from collections.abc import Iterable
 from pathlib import Path
 
+import numpy as np
 import pytest
 import support
 
@@ -18,21 +19,81 @@ INPUT_S = """\
 """
 EXPECTED = 4277556
 
+SPACE = ord(' ')
+ZERO = ord('0')
+INT64_DIGITS = 18  # every 18 digit number fits
 
-def compute(s: str) -> int:
-    rows = s.splitlines()
-    columns = zip(*(row.split() for row in rows), strict=False)
 
-    total = 0
-    for column in columns:
-        *nums, op_char = column
-        operator = mul if op_char == '*' else add
-        nums_iter = map(int, nums)
-        total += functools.reduce(operator, nums_iter)
+def stream_total(lines: Iterable[str]) -> int:
+    """Fold number rows into per-column sums and products, the last row picks one."""
+    sums: list[int] = []
+    products: list[int] = []
+    row: list[str] = []
+    for line in lines:
+        # the previous row wasn't the last one, so it holds numbers
+        nums = list(map(int, row))
+        if not sums:
+            sums, products = nums, nums.copy()
+        else:
+            for i, (total, product, n) in enumerate(zip(sums, products, nums, strict=False)):
+                sums[i], products[i] = total + n, product * n
+        row = line.split()
 
+    return sum(
+        product if op_char == '*' else total
+        for total, product, op_char in zip(sums, products, row, strict=False)
+    )
+
+
+def matrix_total(lines: Iterable[str]) -> int:
+    """Read every row's numbers at once from a padded character matrix."""
+    grid = support.char_matrix(lines)
+    rows, ops = grid[:-1], grid[-1]
+
+    # problems are runs of columns holding a digit in some row
+    cols = np.flatnonzero((rows != SPACE).any(axis=0))
+    starts = np.flatnonzero(np.diff(cols, prepend=-2) != 1)
+    widths = np.diff(starts, append=len(cols))
+    cells = rows[:, cols]
+    is_digit = cells != SPACE
+    digits = np.where(is_digit, cells.astype(np.int64) - ZERO, 0)
+    is_mul = np.maximum.reduceat(ops[cols], starts) == ord('*')
+
+    # a sum has at most len(str(terms)) more digits than its widest term and a
+    # product at most as many as all its factors, past int64 go exact
+    counts = np.add.reduceat(is_digit, starts, axis=1)
+    bound = np.where(is_mul, counts.sum(axis=0), counts.max(axis=0) + len(str(len(rows))))
+    exact = bound > INT64_DIGITS
+
+    # a digit's place value is set by the digits after it in the same number
+    seen = np.cumsum(is_digit, axis=1)
+    after = np.repeat(seen[:, starts + widths - 1], widths, axis=1) - seen
+    numbers = np.add.reduceat(digits * 10**after, starts, axis=1)  # wraps where exact
+
+    total = sum(numbers[:, ~exact & ~is_mul].sum(axis=0).tolist())
+    total += sum(numbers[:, ~exact & is_mul].prod(axis=0).tolist())
+    for start, width, product in zip(starts[exact], widths[exact], is_mul[exact], strict=True):
+        terms = [
+            int(row.tobytes().replace(b' ', b'') or b'0') for row in cells[:, start : start + width]
+        ]
+        total += math.prod(terms) if product else sum(terms)
     return total
 
 
+ENGINES: dict[str, Callable[[Iterable[str]], int]] = {
+    'matrix': matrix_total,
+    'stream': stream_total,
+}
+
+
+def compute_stream(lines: Iterable[str], engine: str = 'matrix') -> int:
+    return ENGINES[engine](lines)
+
+
+def compute(s: str, engine: str = 'matrix') -> int:
+    return compute_stream(s.splitlines(), engine)
+
+
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
@@ -42,13 +103,59 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+@pytest.mark.parametrize(
+    ('op', 'terms'),
+    [
+        ('*', (3037000500, 3037000500)),  # just past int64
+        ('*', (12345678901234567890, 98765432109, 31415926535)),
+        ('*', (999999999, 999999999)),  # 18 digits, still int64
+        ('+', (9999999999999999999, 9999999999999999999)),
+    ],
+)
+def test_exact(op: str, terms: tuple[int, ...]) -> None:
+    # one term per row
+    width = max(len(str(term)) for term in terms)
+    rows = [str(term).rjust(width) for term in terms]
+    s = '\n'.join([*rows, op.ljust(len(rows[0]))]) + '\n'
+    expected = math.prod(terms) if op == '*' else sum(terms)
+    assert compute(s) == compute(s, 'stream') == expected
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_engines(engine: str) -> None:
+    # hundreds of problems of mixed widths and alignments, some past int64,
+    # on lines that end at their last digit rather than padded to one width
+    problems = [
+        ('+' if i % 3 else '*', [(i + 1) * 7**j % 10 ** (1 + (i + j) % 7) for j in range(4)])
+        for i in range(300)
+    ]
+    widths = [max(len(str(term)) for term in terms) for _, terms in problems]
+    rows = [
+        ' '.join(
+            str(terms[row]).rjust(width) if i % 2 else str(terms[row]).ljust(width)
+            for i, ((_, terms), width) in enumerate(zip(problems, widths, strict=True))
+        ).rstrip()
+        for row in range(4)
+    ]
+    ops = ' '.join(op.ljust(width) for (op, _), width in zip(problems, widths, strict=True))
+    s = '\n'.join([*rows, ops.rstrip()]) + '\n'
+    expected = sum(math.prod(terms) if op == '*' else sum(terms) for op, terms in problems)
+    assert compute(s, engine) == expected
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    parser.add_argument('--engine', choices=ENGINES, default='matrix')
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
-    with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text(), args.engine)
+        return 0
+
+    with support.open_lines(args.data_file) as lines, support.timing():
+        print(compute_stream(lines, args.engine))
 
     return 0
 
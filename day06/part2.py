@@ -1,9 +1,13 @@
 import argparse
 import functools
+import math
+from collections.abc import Callable
+from collections.abc import Iterable
 from operator import add
 from operator import mul
 from pathlib import Path
 
+import numpy as np
 import pytest
 import support
 
@@ -19,30 +23,93 @@ INPUT_S = """\
 EXPECTED = 3263827
 
 
-def compute(s: str) -> int:
-    rows = s.splitlines()
-    columns = zip(*rows, strict=False)
+OPERATIONS = {'*': mul, '+': add}
 
+SPACE = ord(' ')
+ZERO = ord('0')
+INT64_DIGITS = 18  # every 18 digit number fits
+
+
+def stream_total(lines: Iterable[str]) -> int:
+    # number read top to bottom in each character column, None while blank
+    numbers: list[int | None] = []
+    ops_row = ''
+    for line in lines:
+        # the previous row wasn't the last one, so it holds digits
+        numbers.extend([None] * (len(ops_row) - len(numbers)))
+        for col, char in enumerate(ops_row):
+            if char.isdigit():
+                numbers[col] = (numbers[col] or 0) * 10 + int(char)
+        ops_row = line
+
+    # the last row may stop short of the numbers above it
+    ops_row = ops_row.ljust(len(numbers))
     total = 0
     to_reduce = []
-    operations = {'*': mul, '+': add}
-    for column in reversed(list(columns)):
-        *nums, op_char = column
-
-        num = ''.join(nums).strip()
-        if not num:
+    for col in reversed(range(len(numbers))):
+        num = numbers[col]
+        if num is None:
             continue
 
-        to_reduce.append(int(num))
-
-        if op_char in operations:
-            operator = operations[op_char]
+        to_reduce.append(num)
+        if ops_row[col] in OPERATIONS:
+            operator = OPERATIONS[ops_row[col]]
             total += functools.reduce(operator, to_reduce)
             to_reduce.clear()
 
     return total
 
 
+def matrix_total(lines: Iterable[str]) -> int:
+    """Read every column's number at once from a padded character matrix."""
+    grid = support.char_matrix(lines)
+    rows, ops = grid[:-1], grid[-1]
+
+    # problems are runs of columns holding a digit in some row
+    cols = np.flatnonzero((rows != SPACE).any(axis=0))
+    starts = np.flatnonzero(np.diff(cols, prepend=-2) != 1)
+    widths = np.diff(starts, append=len(cols))
+    cells = rows[:, cols]
+    is_digit = cells != SPACE
+    digits = np.where(is_digit, cells.astype(np.int64) - ZERO, 0)
+    is_mul = np.maximum.reduceat(ops[cols], starts) == ord('*')
+
+    # a sum has at most len(str(terms)) more digits than its widest term and a
+    # product at most as many as all its factors, past int64 go exact
+    counts = is_digit.sum(axis=0)
+    bound = np.where(
+        is_mul,
+        np.add.reduceat(counts, starts),
+        np.maximum.reduceat(counts, starts) + len(str(widths.max(initial=0))),
+    )
+    exact = bound > INT64_DIGITS
+
+    # a digit's place value is set by the digits below it in the same column
+    below = np.cumsum(is_digit[::-1], axis=0)[::-1] - is_digit
+    numbers = (digits * 10**below).sum(axis=0)  # wraps where exact
+
+    total = sum(np.add.reduceat(numbers, starts)[~exact & ~is_mul].tolist())
+    total += sum(np.multiply.reduceat(numbers, starts)[~exact & is_mul].tolist())
+    for start, width, product in zip(starts[exact], widths[exact], is_mul[exact], strict=True):
+        terms = [int(col.tobytes().replace(b' ', b'')) for col in cells[:, start : start + width].T]
+        total += math.prod(terms) if product else sum(terms)
+    return total
+
+
+ENGINES: dict[str, Callable[[Iterable[str]], int]] = {
+    'matrix': matrix_total,
+    'stream': stream_total,
+}
+
+
+def compute_stream(lines: Iterable[str], engine: str = 'matrix') -> int:
+    return ENGINES[engine](lines)
+
+
+def compute(s: str, engine: str = 'matrix') -> int:
+    return compute_stream(s.splitlines(), engine)
+
+
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
@@ -52,13 +119,60 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+@pytest.mark.parametrize(
+    ('op', 'terms'),
+    [
+        ('*', (3037000500, 3037000500)),  # just past int64
+        ('*', (12345678901234567890, 98765432109, 31415926535)),
+        ('*', (999999999, 999999999)),  # 18 digits, still int64
+        ('+', (9999999999999999999, 9999999999999999999)),
+    ],
+)
+def test_exact(op: str, terms: tuple[int, ...]) -> None:
+    # one term per column, read top to bottom
+    height = max(len(str(term)) for term in terms)
+    rows = [''.join(str(term).ljust(height)[i] for term in terms) for i in range(height)]
+    s = '\n'.join([*rows, op.ljust(len(rows[0]))]) + '\n'
+    expected = math.prod(terms) if op == '*' else sum(terms)
+    assert compute(s) == compute(s, 'stream') == expected
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_engines(engine: str) -> None:
+    # hundreds of problems of mixed widths and alignments, some past int64,
+    # on lines that end at their last digit rather than padded to one width
+    problems = [
+        ('+' if i % 3 else '*', [(i + 1) * 7**j % 10 ** (1 + (i + j) % 7) for j in range(4)])
+        for i in range(300)
+    ]
+    height = max(len(str(term)) for _, terms in problems for term in terms)
+    columns = [
+        [str(term).rjust(height) if i % 2 else str(term).ljust(height) for term in terms]
+        for i, (_, terms) in enumerate(problems)
+    ]
+    rows = [
+        ' '.join(''.join(column[row] for column in block) for block in columns).rstrip()
+        for row in range(height)
+    ]
+    ops = ' '.join(op.ljust(len(terms)) for op, terms in problems)
+    s = '\n'.join([*rows, ops.rstrip()]) + '\n'
+    expected = sum(math.prod(terms) if op == '*' else sum(terms) for op, terms in problems)
+    assert compute(s, engine) == expected
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    parser.add_argument('--engine', choices=ENGINES, default='matrix')
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
-    with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text(), args.engine)
+        return 0
+
+    with support.open_lines(args.data_file) as lines, support.timing():
+        print(compute_stream(lines, args.engine))
 
     return 0
 
@@ -1,4 +1,5 @@
 import argparse
+from collections.abc import Callable
 from collections.abc import Generator
 from pathlib import Path
 
@@ -35,21 +36,44 @@ def load_splitters(s: str) -> Generator[set[int]]:
     )
 
 
-def compute(s: str) -> int:
-    splitters = load_splitters(s)
+def load_splitter_masks(s: str) -> Generator[int]:
+    for row in s.splitlines()[2::2]:
+        yield int(row.replace('.', '0').replace('^', '1')[::-1], 2)  # LSB
+
+
+def set_splits(s: str) -> int:
     beams = {s.find('S')}
     total_splits = 0
-    for current_splitters in splitters:
-        for splitter in current_splitters:
-            if splitter in beams:
-                total_splits += 1
-            beams -= {splitter}
-            beams.add(splitter - 1)
-            beams.add(splitter + 1)
+    for current_splitters in load_splitters(s):
+        hits = beams & current_splitters
+        total_splits += len(hits)
+        beams -= hits
+        beams.update(splitter + side for splitter in hits for side in (-1, 1))
 
     return total_splits
 
 
+def bitset_splits(s: str) -> int:
+    beams = 1 << s.find('S')
+    total_splits = 0
+    for splitters in load_splitter_masks(s):
+        hits = beams & splitters
+        total_splits += hits.bit_count()
+        beams = (beams & ~splitters) | (hits << 1) | (hits >> 1)
+
+    return total_splits
+
+
+ENGINES: dict[str, Callable[[str], int]] = {
+    'bitset': bitset_splits,
+    'set': set_splits,
+}
+
+
+def compute(s: str, engine: str = 'bitset') -> int:
+    return ENGINES[engine](s)
+
+
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
@@ -59,13 +83,42 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize(
+    ('input_s', 'expected'),
+    [
+        # splitters off to the side are never reached
+        ('..S..\n.....\n^...^\n.....\n..^..\n.....\n', 1),
+        # a beam split off the left edge is gone
+        ('S....\n.....\n^....\n.....\n^^...\n.....\n', 2),
+        # full rows past the 64 and 128 bit marks, a far block out of reach
+        (
+            '\n'.join(
+                ['.' * 130 + 'S' + '.' * 69, '.' * 200]
+                + ['^' * 200, '.' * 200] * 10
+                + ['^' * 40 + '.' * 160, '.' * 200],
+            ),
+            55,
+        ),
+    ],
+)
+def test_engines(engine: str, input_s: str, expected: int) -> None:
+    assert compute(input_s, engine) == expected
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    parser.add_argument('--engine', choices=ENGINES, default='bitset')
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text(), args.engine)
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+        print(compute(f.read(), args.engine))
 
     return 0
 
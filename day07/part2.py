@@ -1,8 +1,7 @@
 import argparse
-from collections.abc import Generator
-from functools import cache
 from pathlib import Path
 
+import numpy as np
 import pytest
 import support
 
@@ -29,31 +28,27 @@ INPUT_S = """\
 """
 EXPECTED = 40
 
-
-def load_splitters(s: str) -> Generator[set[int]]:
-    yield from (
-        {idx for idx, char in enumerate(row) if char == '^'} for row in s.splitlines()[2::2]
-    )
+SPLITTER = ord('^')
+INT64_BITS = 63
 
 
 def compute(s: str) -> int:
-    splitters = tuple(frozenset(row) for row in load_splitters(s))
-    start = s.find('S')
+    lines = s.splitlines()
+    # pad a column each side for beams split off the edge, they go straight down
+    splitters = np.pad(support.char_matrix(lines)[2::2] == SPLITTER, ((0, 0), (1, 1)))
 
-    @cache
-    def count_timelines(level: int, position: int) -> int:
-        if level == len(splitters):
-            return 1
+    # each splitter row can at most double the timelines
+    doublings = int(splitters.any(axis=1).sum())
+    counts = np.zeros(splitters.shape[1], dtype=np.int64 if doublings < INT64_BITS else object)
+    counts[lines[0].find('S') + 1] = 1
 
-        if position in splitters[level]:
-            # Hit a splitter: particle splits into two timelines
-            return count_timelines(level + 1, position - 1) + count_timelines(
-                level + 1, position + 1
-            )
-        # No splitter: continue straight
-        return count_timelines(level + 1, position)
+    for row in splitters:
+        hits = np.where(row, counts, 0)
+        counts -= hits
+        counts[:-1] += hits[1:]
+        counts[1:] += hits[:-1]
 
-    return count_timelines(0, start)
+    return sum(counts.tolist())
 
 
 # @pytest.mark.solved
@@ -65,11 +60,26 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+def test_tall() -> None:
+    # every beam splits on each full row, too many timelines for int64, then a
+    # long empty tail that a per-row recursion would not get out of
+    width = 203
+    lines = ['S'.center(width, '.'), '.' * width]
+    lines += ['^' * width, '.' * width] * 100
+    lines += ['.' * width] * 10_000
+    assert compute('\n'.join(lines)) == 2**100
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
         print(compute(f.read()))
 
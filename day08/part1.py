@@ -1,13 +1,14 @@
 import argparse
 import functools
-import heapq
-import itertools
 from operator import mul
 from pathlib import Path
 
 import numpy as np
+import numpy.typing as npt
 import pytest
 import support
+from support import UnionFind
+from support import closest_pairs
 
 INPUT_TXT = Path(__file__).parent / 'input.txt'
 
@@ -36,39 +37,28 @@ INPUT_S = """\
 """
 EXPECTED = 40
 
+NUM_STEPS = 1_000
 
-def compute(s: str, num_steps: int) -> int:
+
+def parse_points(s: str) -> npt.NDArray[np.int64]:
+    points = dict.fromkeys(tuple(map(int, line.split(','))) for line in s.splitlines())
+    return np.array(list(points), dtype=np.int64).reshape(-1, 3)
+
+
+def compute(s: str, num_steps: int = NUM_STEPS) -> int:
     # NOTE: for test do 10 steps of the connecting process
     #  For the actual attempt do 1000 steps.
 
-    # create points
-    points = {tuple(map(int, line.split(','))) for line in s.splitlines()}
-    # add to heap (priority queue by distance)
-    heap: list[tuple[float, tuple[int, ...], tuple[int, ...]]] = []
-    for a, b in itertools.combinations(points, 2):
-        a_arr = np.array(a)
-        b_arr = np.array(b)
-        dist = np.linalg.norm(a_arr - b_arr)
-        heapq.heappush(heap, (dist, a, b))
-
-    # create a set of sets
-    junctions = [{p} for p in points]
-    for _ in range(num_steps):
-        dist, a, b = heapq.heappop(heap)
-
-        # merge the two sets
-        # find the sets containing a and b, add them together and back
-        set_a = next(s for s in junctions if a in s)
-        set_b = next(s for s in junctions if b in s)
-
-        # only merge if they are different sets
-        if set_a is not set_b:
-            junctions.remove(set_a)
-            junctions.remove(set_b)
-            junctions.append(set_a | set_b)
-
-    lens = sorted(map(len, junctions))
+    points = parse_points(s)
 
+    # the resulting circuits don't depend on the order the closest pairs are joined
+    i, j, _ = closest_pairs(points, num_steps)
+
+    circuits = UnionFind(len(points))
+    for a, b in zip(i.tolist(), j.tolist(), strict=True):
+        circuits.union(a, b)
+
+    lens = sorted(circuits.component_sizes())
     return functools.reduce(mul, lens[-3:])
 
 
@@ -84,10 +74,15 @@ def test(input_s: str, num_steps: int, expected: int) -> None:
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read(), 1_000))
+        print(compute(f.read()))
 
     return 0
 
@@ -1,11 +1,16 @@
 import argparse
-import heapq
 import itertools
+import math
+from collections.abc import Callable
 from pathlib import Path
 
 import numpy as np
+import numpy.typing as npt
 import pytest
 import support
+from support import GridIndex
+from support import UnionFind
+from support import nearest_pairs
 
 INPUT_TXT = Path(__file__).parent / 'input.txt'
 
@@ -35,37 +40,89 @@ INPUT_S = """\
 EXPECTED = 25272
 
 
-def compute(s: str) -> int:
-    # NOTE: for test do 10 steps of the connecting process
-    #  For the actual attempt do 1000 steps.
-
-    # create points
-    points = {tuple(map(int, line.split(','))) for line in s.splitlines()}
-    # add to heap (priority queue by distance)
-    heap: list[tuple[float, tuple[int, ...], tuple[int, ...]]] = []
-    for a, b in itertools.combinations(points, 2):
-        a_arr = np.array(a)
-        b_arr = np.array(b)
-        dist = np.linalg.norm(a_arr - b_arr)
-        heapq.heappush(heap, (dist, a, b))
-
-    # create a set of sets
-    junctions = [{p} for p in points]
-    while len(junctions) != 1:
-        dist, a, b = heapq.heappop(heap)
-
-        # merge the two sets
-        # find the sets containing a and b, add them together and back
-        set_a = next(s for s in junctions if a in s)
-        set_b = next(s for s in junctions if b in s)
-
-        # only merge if they are different sets
-        if set_a is not set_b:
-            junctions.remove(set_a)
-            junctions.remove(set_b)
-            junctions.append(set_a | set_b)
-
-    return a[0] * b[0]
+def parse_points(s: str) -> npt.NDArray[np.int64]:
+    points = dict.fromkeys(tuple(map(int, line.split(','))) for line in s.splitlines())
+    return np.array(list(points), dtype=np.int64).reshape(-1, 3)
+
+
+def heap_last_pair(points: npt.NDArray[np.int64]) -> tuple[int, int]:
+    # join the closest pairs until everything is a single circuit,
+    # streamed so the O(n^2) pairs never have to fit in memory at once
+    circuits = UnionFind(len(points))
+    for _, a, b in nearest_pairs(points):
+        if circuits.union(a, b) and circuits.components == 1:
+            return a, b
+
+    return 0, 0
+
+
+def closest_links(
+    i: npt.NDArray[np.intp],
+    j: npt.NDArray[np.intp],
+    dist2: npt.NDArray[np.int64],
+    labels: npt.NDArray[np.intp],
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[np.int64]]:
+    """Keep the first pair in join order between each two circuits.
+
+    Once it is joined any later pair between the same two circuits is skipped,
+    so the rest never change which joins happen.
+    """
+    low = np.minimum(labels[i], labels[j])
+    high = np.maximum(labels[i], labels[j])
+    order = np.lexsort((j, i, dist2, high, low))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (np.diff(low[order]) != 0) | (np.diff(high[order]) != 0)
+    keep = order[first]
+    return i[keep], j[keep], dist2[keep]
+
+
+def grid_last_pair(points: npt.NDArray[np.int64]) -> tuple[int, int]:
+    """Make the same joins as `heap_last_pair`, only over pairs found via a spatial grid.
+
+    Pairs up to a radius are joined closest first, then the radius doubles.
+    Pairs already inside one circuit are never built, and of the rest only the
+    closest between each two circuits is kept, so a band stays small even when
+    one far outlier makes the radius cover a whole dense cluster.
+    """
+    n = len(points)
+    if n < 2:  # noqa: PLR2004
+        return 0, 0
+
+    # start around the typical nearest neighbour spacing, found for a sample
+    nearest = []
+    for point in points[:: max(1, n // 256)]:
+        diff = points - point
+        nearest.append(np.partition(np.einsum('ij,ij->i', diff, diff), 1)[1])
+    radius = max(1, math.isqrt(int(np.median(nearest))))
+    # cells coarse enough that ids across the whole extent still fit int64
+    extent = int(np.ptp(points, axis=0).max()) + 1
+    min_cell = -(-extent // (2 ** (60 // points.shape[1]) - 3))
+
+    circuits = UnionFind(n)
+    while True:
+        labels = np.array([circuits.find(x) for x in range(n)])
+        index = GridIndex(points, max(radius, min_cell))
+        links = [closest_links(*chunk, labels) for chunk in index.iter_pairs_within(radius, labels)]
+        if links:
+            i, j, dist2 = (np.concatenate(parts) for parts in zip(*links, strict=True))
+            i, j, dist2 = closest_links(i, j, dist2, labels)
+            order = np.lexsort((j, i, dist2))
+            for a, b in zip(i[order].tolist(), j[order].tolist(), strict=True):
+                if circuits.union(a, b) and circuits.components == 1:
+                    return a, b
+        radius *= 2
+
+
+ENGINES: dict[str, Callable[[npt.NDArray[np.int64]], tuple[int, int]]] = {
+    'grid': grid_last_pair,
+    'heap': heap_last_pair,
+}
+
+
+def compute(s: str, engine: str = 'grid') -> int:
+    points = parse_points(s)
+    a, b = ENGINES[engine](points)
+    return int(points[a, 0] * points[b, 0])
 
 
 # @pytest.mark.solved
@@ -77,13 +134,64 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize(
+    ('input_s', 'expected'),
+    [
+        # one point is already a single circuit
+        ('5,5,5\n', 25),
+        # repeated points are one junction box
+        ('3,1,1\n3,1,1\n7,2,2\n', 21),
+        # an outlier takes the grid radius many doublings to reach
+        ('1,0,0\n2,0,0\n3,0,0\n1000000,0,0\n', 3000000),
+        ('1,1,1\n2,2,2\n3,1,2\n500,500,500\n501,499,500\n503,500,501\n9000,1,1\n', 4527000),
+        # a dense cluster and one point far off, which the cluster must not fill a band with
+        (
+            '\n'.join(
+                [
+                    *(f'{x},{y},{z}' for x in range(7) for y in range(7) for z in range(7)),
+                    '100000000,0,0',
+                ]
+            ),
+            600_000_000,
+        ),
+        # every distance is tied, joins must follow the same order
+        ('\n'.join(f'{x},{y},{z}' for x in range(1, 5) for y in range(3) for z in range(2)), 12),
+    ],
+)
+def test_engines(engine: str, input_s: str, expected: int) -> None:
+    assert compute(input_s, engine) == expected
+
+
+@pytest.mark.parametrize(
+    ('batch_size', 'max_batch_size'),
+    [(1, 1), (1, 64), (7, 28), (200, 200)],
+)
+def test_nearest_pairs_batches(batch_size: int, max_batch_size: int) -> None:
+    # a lattice ties many pairs on each distance, more than a batch holds
+    points = np.array(list(itertools.product(range(4), repeat=3)), dtype=np.int64)
+    i, j, dist2 = support.pair_sq_distances(points)
+    order = np.lexsort((j, i, dist2))
+    expected = list(zip(dist2[order].tolist(), i[order].tolist(), j[order].tolist(), strict=True))
+    pairs = nearest_pairs(
+        points, batch_size=batch_size, max_batch_size=max_batch_size, block_bytes=1024
+    )
+    assert list(pairs) == expected
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    parser.add_argument('--engine', choices=ENGINES, default='grid')
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text(), args.engine)
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+        print(compute(f.read(), args.engine))
 
     return 0
 
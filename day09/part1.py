@@ -1,8 +1,9 @@
 import argparse
-import heapq
-import itertools
+from collections.abc import Callable
 from pathlib import Path
 
+import numpy as np
+import numpy.typing as npt
 import pytest
 import support
 
@@ -22,16 +23,62 @@ INPUT_S = """\
 EXPECTED = 50
 
 
-def compute(s: str) -> int:
-    points = {tuple(map(int, line.split(','))) for line in s.splitlines()}
+BLOCK_BYTES = 32 << 20
 
-    heap: list[tuple[int, tuple[int, ...], tuple[int, ...]]] = []
-    for a, b in itertools.combinations(points, 2):
-        area = (abs(a[0] - b[0]) + 1) * (abs(a[1] - b[1]) + 1)
-        heapq.heappush(heap, (area, a, b))
+Points = npt.NDArray[np.int64]
 
-    area, _max_a, _max_b = max(heap)
-    return area
+
+def parse_points(s: str) -> Points:
+    points = dict.fromkeys(tuple(map(int, line.split(','))) for line in s.splitlines())
+    return np.array(list(points), dtype=np.int64).reshape(-1, 2)
+
+
+def max_area(corners_a: Points, corners_b: Points) -> int:
+    """Largest rectangle spanned by a corner from `corners_a` and one from `corners_b`."""
+    # a few (rows x len(b)) int64 temporaries per block
+    rows = max(1, BLOCK_BYTES // (3 * 8 * max(len(corners_b), 1)))
+    best = 0
+    for start in range(0, len(corners_a), rows):
+        block = corners_a[start : start + rows, np.newaxis, :]
+        sides = np.abs(block - corners_b[np.newaxis, :, :]) + 1
+        best = max(best, int((sides[..., 0] * sides[..., 1]).max(initial=0)))
+    return best
+
+
+def staircase(points: Points, sign_x: int, sign_y: int) -> Points:
+    """Points not dominated towards (`sign_x`, `sign_y`), -1 meaning lower values."""
+    flipped = points * np.array([-sign_x, -sign_y])
+    # sweep by x, keep points strictly lower than everything before them
+    order = np.lexsort((flipped[:, 1], flipped[:, 0]))
+    ys = flipped[order, 1]
+    lowest_before = np.minimum.accumulate(np.concatenate(([np.iinfo(np.int64).max], ys[:-1])))
+    return points[order[ys < lowest_before]]
+
+
+def all_pairs(points: Points) -> int:
+    return max_area(points, points)
+
+
+def staircase_pairs(points: Points) -> int:
+    """Only test corners on the outer staircases.
+
+    Moving a corner further out never shrinks the rectangle, so the best one
+    spans the lower-left and upper-right staircases or the other two.
+    """
+    return max(
+        max_area(staircase(points, -1, -1), staircase(points, 1, 1)),
+        max_area(staircase(points, -1, 1), staircase(points, 1, -1)),
+    )
+
+
+ENGINES: dict[str, Callable[[Points], int]] = {
+    'all': all_pairs,
+    'staircase': staircase_pairs,
+}
+
+
+def compute(s: str, engine: str = 'staircase') -> int:
+    return ENGINES[engine](parse_points(s))
 
 
 # @pytest.mark.solved
@@ -43,13 +90,42 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize(
+    ('input_s', 'expected'),
+    [
+        ('1,4\n2,4\n9,4\n', 9),
+        # the best corners are upper left and lower right
+        ('0,10\n10,0\n5,5\n', 121),
+        # corners sharing an x or y with another one stay on the staircase
+        ('0,0\n0,5\n3,0\n3,5\n1,2\n', 24),
+        ('100000,1\n1,100000\n50000,50000\n', 10_000_000_000),
+        # a diamond, where every corner is on some staircase
+        (
+            '\n'.join(
+                f'{50 + x},{50 + (50 - abs(x)) * s}' for x in range(-50, 51) for s in (1, -1)
+            ),
+            2601,
+        ),
+    ],
+)
+def test_engines(engine: str, input_s: str, expected: int) -> None:
+    assert compute(input_s, engine) == expected
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    parser.add_argument('--engine', choices=ENGINES, default='staircase')
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text(), args.engine)
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+        print(compute(f.read(), args.engine))
 
     return 0
 
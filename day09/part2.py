@@ -1,7 +1,10 @@
 import argparse
 import itertools
+from collections.abc import Callable
 from pathlib import Path
 
+import numpy as np
+import numpy.typing as npt
 import pytest
 import shapely
 import support
@@ -74,8 +77,8 @@ def _rect_area(rect: shapely.Polygon) -> int:
     return int((abs(x2 - x1) + 1) * (abs(y2 - y1) + 1))
 
 
-def compute(s: str) -> int:
-    points = [Point(map(int, row.split(','))) for row in s.splitlines()]
+def shapely_pairs(vertices: list[tuple[int, int]]) -> int:
+    points = [Point(vertex) for vertex in vertices]
     polygon = shapely.Polygon(points)
     max_area = 0
 
@@ -87,6 +90,115 @@ def compute(s: str) -> int:
     return max_area
 
 
+SHAPELY_CHUNK = 1 << 16
+
+
+def shapely_batched_pairs(vertices: list[tuple[int, int]]) -> int:
+    """Run the GEOS checks of `shapely_pairs` as one vectorized call per chunk of boxes.
+
+    At most `SHAPELY_CHUNK` candidate pairs (and their boxes) exist at a time.
+    """
+    points = np.array(vertices, dtype=np.int64)
+    polygon = shapely.Polygon(points)
+    shapely.prepare(polygon)
+
+    rows = max(1, SHAPELY_CHUNK // len(points))
+    best = 0
+    for start in range(0, len(points), rows):
+        block = np.arange(start, min(start + rows, len(points)))
+        a, b = np.nonzero(np.arange(len(points)) > block[:, np.newaxis])
+        a += start
+        sides = np.abs(points[a] - points[b]) + 1
+        area = sides[:, 0] * sides[:, 1]
+
+        # boxes that can't beat the best so far don't need building
+        candidates = area > best
+        a, b, area = a[candidates], b[candidates], area[candidates]
+        if not len(area):
+            continue
+        (x1, y1), (x2, y2) = points[a].T, points[b].T
+        boxes = shapely.box(x1, y1, x2, y2)
+        contained = area[shapely.contains(polygon, boxes)]
+        best = max(best, int(contained.max(initial=0)))
+
+    return best
+
+
+BLOCK_BYTES = 32 << 20
+
+
+def outside_prefix_sums(
+    xi: npt.NDArray[np.intp],
+    yi: npt.NDArray[np.intp],
+) -> npt.NDArray[np.int64]:
+    """2D prefix sums of cells outside the polygon on the compressed grid.
+
+    Cell `[l, k]` spans `xs[k]..xs[k+1]` x `ys[l]..ys[l+1]` and is either
+    fully inside or fully outside the rectilinear polygon.
+    """
+    width, height = xi.max() + 1, yi.max() + 1
+    next_xi, next_yi = np.roll(xi, -1), np.roll(yi, -1)
+    vertical = xi == next_xi
+    low = np.minimum(yi, next_yi)[vertical]
+    high = np.maximum(yi, next_yi)[vertical]
+
+    # each vertical edge flips inside/outside for the cells right of it in its rows
+    crossings = np.zeros((height, width), dtype=np.int64)
+    np.add.at(crossings, (low, xi[vertical]), 1)
+    np.add.at(crossings, (high, xi[vertical]), -1)
+    crossings = crossings.cumsum(axis=0)
+    inside = crossings.cumsum(axis=1) % 2 == 1
+
+    prefix = np.zeros((height, width), dtype=np.int64)
+    prefix[1:, 1:] = (~inside[:-1, :-1]).cumsum(axis=0).cumsum(axis=1)
+    return prefix
+
+
+def compressed_pairs(vertices: list[tuple[int, int]]) -> int:
+    """Check every candidate rectangle in O(1) on a coordinate compressed grid."""
+    points = np.array(vertices, dtype=np.int64)
+    xi = np.unique(points[:, 0], return_inverse=True)[1]
+    yi = np.unique(points[:, 1], return_inverse=True)[1]
+    prefix = outside_prefix_sums(xi, yi)
+
+    rows = max(1, BLOCK_BYTES // (8 * 8 * len(points)))
+    best = 0
+    for start in range(0, len(points), rows):
+        block = slice(start, start + rows)
+        sides = np.abs(points[block, np.newaxis, :] - points[np.newaxis, :, :]) + 1
+        area = sides[..., 0] * sides[..., 1]
+
+        # only rectangles that could beat the best so far, flat ones are never contained
+        a, b = np.nonzero((area > best) & (sides[..., 0] > 1) & (sides[..., 1] > 1))
+        if not len(a):
+            continue
+        a += start
+        x_low, x_high = np.minimum(xi[a], xi[b]), np.maximum(xi[a], xi[b])
+        y_low, y_high = np.minimum(yi[a], yi[b]), np.maximum(yi[a], yi[b])
+        outside = (
+            prefix[y_high, x_high]
+            - prefix[y_low, x_high]
+            - prefix[y_high, x_low]
+            + prefix[y_low, x_low]
+        )
+        contained = area[a - start, b][outside == 0]
+        best = max(best, int(contained.max(initial=0)))
+
+    return best
+
+
+ENGINES: dict[str, Callable[[list[tuple[int, int]]], int]] = {
+    'compressed': compressed_pairs,
+    'shapely': shapely_pairs,
+    'shapely-batched': shapely_batched_pairs,
+}
+
+
+def compute(s: str, engine: str = 'compressed') -> int:
+    vertices = [(int(x), int(y)) for x, y in (row.split(',') for row in s.splitlines())]
+    return ENGINES[engine](vertices)
+
+
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
@@ -101,13 +213,42 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize(
+    ('input_s', 'expected'),
+    [
+        # a notch splits the square, the best box sits beside it
+        ('0,0\n10,0\n10,10\n6,10\n6,4\n4,4\n4,10\n0,10\n', 55),
+        # the other winding, and a start partway round
+        ('\n'.join(reversed(INPUT_S_4.splitlines())), EXPECTED_4),
+        ('\n'.join(INPUT_S_3.splitlines()[5:] + INPUT_S_3.splitlines()[:5]), EXPECTED_3),
+        # wide gaps between coordinates, past int32 areas
+        (
+            '\n'.join(
+                f'{int(x) * 100_000 + 7},{int(y) * 30_000 + 11}'
+                for x, y in (line.split(',') for line in INPUT_S_2.splitlines())
+            ),
+            84_000_820_001,
+        ),
+    ],
+)
+def test_engines(engine: str, input_s: str, expected: int) -> None:
+    assert compute(input_s, engine) == expected
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    parser.add_argument('--engine', choices=ENGINES, default='compressed')
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text(), args.engine)
+        return 0
+
     with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+        print(compute(f.read(), args.engine))
 
     return 0
 
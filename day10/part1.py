@@ -1,11 +1,16 @@
 import argparse
+import functools
 from collections import deque
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
 import support
 
 INPUT_TXT = Path(__file__).parent / 'input.txt'
+CACHE_FILE = Path(__file__).parent / 'part1_cache.json'
 
 # NOTE: paste test text here
 INPUT_S = """\
@@ -33,7 +38,7 @@ def parse_line(line: str) -> tuple[int, list[int], tuple[int, ...]]:
     return lights, buttons, joltages
 
 
-def solve_one(lights_target: int, buttons: list[int], _joltages: tuple[int, ...]) -> int:
+def bfs_solve_one(lights_target: int, buttons: list[int], _joltages: tuple[int, ...]) -> int:
     # BFS to find shortest path (DFS wouldn't guarantee minimum steps)
     queue = deque([(0, 0)])  # (current_result, steps)
     visited = {0}
@@ -54,12 +59,111 @@ def solve_one(lights_target: int, buttons: list[int], _joltages: tuple[int, ...]
     return 0
 
 
-def compute(s: str) -> int:
-    total = 0
-    for line in s.splitlines():
-        lights_target, buttons, joltages = parse_line(line)
-        total += solve_one(lights_target, buttons, joltages)
-    return total
+def eliminate(lights_target: int, buttons: list[int]) -> tuple[int, list[int]] | None:
+    """Solve the button system over GF(2).
+
+    Returns a particular press set and a null-space basis, both as bitmasks
+    over the buttons, or None when the target is unreachable.
+    """
+    basis: dict[int, tuple[int, int]] = {}  # pivot bit -> (lights, presses)
+    null = []
+    for i, button in enumerate(buttons):
+        lights, presses = button, 1 << i
+        while lights:
+            pivot = lights.bit_length() - 1
+            if pivot not in basis:
+                basis[pivot] = (lights, presses)
+                break
+            lights ^= basis[pivot][0]
+            presses ^= basis[pivot][1]
+        else:
+            null.append(presses)
+
+    lights, presses = lights_target, 0
+    while lights:
+        pivot = lights.bit_length() - 1
+        if pivot not in basis:
+            return None
+        lights ^= basis[pivot][0]
+        presses ^= basis[pivot][1]
+
+    return presses, null
+
+
+def subset_xors(masks: list[int]) -> Iterator[tuple[int, int]]:
+    """Yield (xor, size) for every subset of masks in Gray-code order."""
+    current = chosen = 0
+    yield current, 0
+    for gray in range(1, 1 << len(masks)):
+        bit = (gray & -gray).bit_length() - 1
+        current ^= masks[bit]
+        chosen ^= 1 << bit
+        yield current, chosen.bit_count()
+
+
+def meet_in_the_middle(lights_target: int, buttons: list[int]) -> int:
+    half = len(buttons) // 2
+    fewest: dict[int, int] = {}
+    for lights, count in subset_xors(buttons[:half]):
+        if count < fewest.get(lights, count + 1):
+            fewest[lights] = count
+
+    best = len(buttons) + 1
+    for lights, count in subset_xors(buttons[half:]):
+        left = fewest.get(lights_target ^ lights)
+        if left is not None:
+            best = min(best, left + count)
+    return best
+
+
+def solve_one(lights_target: int, buttons: list[int], _joltages: tuple[int, ...]) -> int:
+    solved = eliminate(lights_target, buttons)
+    if solved is None:
+        return 0
+    presses, null = solved
+
+    # every solution is presses ^ (some combination of the null space), so
+    # enumerate that coset unless splitting the buttons in half is cheaper
+    if 2 * len(null) > len(buttons):
+        return meet_in_the_middle(lights_target, buttons)
+
+    return min((presses ^ combo).bit_count() for combo, _ in subset_xors(null))
+
+
+ENGINES: dict[str, Callable[[int, list[int], tuple[int, ...]], int]] = {
+    'gf2': solve_one,
+    'bfs': bfs_solve_one,
+}
+
+
+def solve_line(line: str, engine: str = 'gf2') -> int:
+    return ENGINES[engine](*parse_line(line))
+
+
+def machine_key(line: str) -> str:
+    lights, buttons, _ = parse_line(line)
+    return f'{lights}:{sorted(buttons)}'
+
+
+def compute_stream(
+    lines: Iterable[str],
+    engine: str = 'gf2',
+    workers: int = 1,
+    cache: support.SolutionCache | None = None,
+) -> int:
+    cache = support.SolutionCache() if cache is None else cache
+    solve = functools.partial(solve_line, engine=engine)
+    keyed = ((f'{engine}:{machine_key(line)}', line) for line in lines)
+    return sum(cache.map(solve, keyed, workers=workers))
+
+
+def compute(
+    s: str,
+    engine: str = 'gf2',
+    workers: int = 1,
+    cache: support.SolutionCache | None = None,
+) -> int:
+    return compute_stream(s.splitlines(), engine, workers, cache)
 
 
 # @pytest.mark.solved
@@ -71,13 +175,64 @@ def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize(
+    ('input_s', 'expected'),
+    [
+        # no button reaches the light
+        ('[#.] (1) {0,0}\n', 0),
+        ('[...] (0,1) (2) {0,0,0}\n', 0),
+        # mostly repeated buttons, more null space than buttons to split
+        ('[##] (0) (1) (0,1) (0) (1) (0,1) (0) (1) {1,1}\n', 1),
+        ('[#.#.#] (0,1) (1,2) (2,3) (3,4) (0,4) (0,2,4) {1,1,1,1,1}\n', 1),
+        (
+            (
+                '[#.##.#..#.#.] (0,1,2) (1,2,3) (2,3,4) (3,4,5) (4,5,6) (5,6,7) (6,7,8) '
+                '(7,8,9) (8,9,10) (9,10,11) (10,11,12) (0,12) (0,6) (3,9) (1,11) '
+                '{0,0,0,0,0,0,0,0,0,0,0,0,0}\n'
+            ),
+            6,
+        ),
+    ],
+)
+def test_engines(engine: str, input_s: str, expected: int) -> None:
+    assert compute(input_s, engine) == expected
+
+
+def test_workers() -> None:
+    assert compute(INPUT_S, workers=2) == EXPECTED
+
+
+def test_cache(tmp_path: Path) -> None:
+    cache = support.SolutionCache(tmp_path / 'cache.json')
+    assert compute(INPUT_S * 2, cache=cache) == 2 * EXPECTED
+    assert len(cache) == len(INPUT_S.splitlines())
+    cache.save()
+
+    reloaded = support.SolutionCache(tmp_path / 'cache.json')
+    assert len(reloaded) == len(cache)
+    assert compute(INPUT_S, cache=reloaded) == EXPECTED
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    parser.add_argument('--engine', choices=ENGINES, default='gf2')
+    parser.add_argument('-j', '--workers', type=int, default=1)
+    parser.add_argument('--cache', action='store_true')
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
-    with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+    if args.bench:
+        support.run_bench(
+            args, compute, Path(args.data_file).read_text(), args.engine, args.workers
+        )
+        return 0
+
+    cache = support.SolutionCache(CACHE_FILE if args.cache else None)
+    with support.open_lines(args.data_file) as lines, support.timing():
+        print(compute_stream(lines, args.engine, args.workers, cache))
+    cache.save()
 
     return 0
 
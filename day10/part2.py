@@ -1,11 +1,18 @@
 import argparse
+import functools
+import math
+from collections.abc import Callable
+from collections.abc import Iterable
 from pathlib import Path
 
+import numpy as np
+import numpy.typing as npt
 import pulp
 import pytest
 import support
 
 INPUT_TXT = Path(__file__).parent / 'input.txt'
+CACHE_FILE = Path(__file__).parent / 'part2_cache.json'
 
 # NOTE: paste test text here
 INPUT_S = """\
@@ -15,6 +22,24 @@ INPUT_S = """\
 """
 EXPECTED = 33
 
+# more buttons than counters, well past what a 2**buttons parity table allows
+INPUT_WIDE = (
+    '[......] (0,1,2,4) (0,1,2,3,4,5) (1,3,4,5) (0,2,3,4,5) (0,1,2,3,4,5) (2) '
+    '(0,1,2,3,4,5) (1,2,3,5) (1,2,3,5) (0,1) (0,1,2,3,4,5) (0,1,2,3,5) (1,2,5) '
+    '(1,2,4,5) (0,2,3,4,5) (0,1,4) {82,112,110,67,88,100}\n'
+    '[........] (0,1,2,4,5,6,7) (1,3,5,6,7) (2,3,6) (6) (1,7) (2) (1,4,5,7) '
+    '(0,1,2,3,4,5,6,7) (0,5,6) (0,1,5,6,7) (1,3,6,7) (1,3,4,5,6,7) (0,1,2,3,4,5,6,7) '
+    '(0,2,3,7) (5,7) (3) (0,1,2,3,4,5,7) (0,2,3,4,5,6,7) {153,133,125,128,86,173,153,199}\n'
+)
+EXPECTED_WIDE = 115 + 212
+
+EPS = 1e-9
+INTEGRAL_TOL = 1e-6
+# realistic machines settle within tens of nodes, past this hand over to CBC
+MAX_NODES = 2_000
+
+Tableau = npt.NDArray[np.float64]
+
 
 def parse_line(line: str) -> tuple[int, list[list[int]], tuple[int, ...]]:
     lights_s, *buttons_s, joltages_s = line.split(' ')
@@ -30,7 +55,7 @@ def parse_line(line: str) -> tuple[int, list[list[int]], tuple[int, ...]]:
     return lights, buttons, joltages
 
 
-def solve_one(buttons: list[list[int]], joltages: tuple[int, ...]) -> int:
+def cbc_solve_one(buttons: list[list[int]], joltages: tuple[int, ...]) -> int:
     """Solve minimum button presses needed to achieve target _joltages."""
     button_effects = [list(button) for button in buttons]
 
@@ -57,30 +82,245 @@ def solve_one(buttons: list[list[int]], joltages: tuple[int, ...]) -> int:
     return int(pulp.value(problem.objective))
 
 
-def compute(s: str) -> int:
-    total = 0
-    for line in s.splitlines():
-        _, buttons, joltages = parse_line(line)
-        total += solve_one(buttons, joltages)
-    return total
+def pivot(tableau: Tableau, basis: list[int], row: int, col: int) -> None:
+    tableau[row] /= tableau[row, col]
+    factors = tableau[:, col].copy()
+    factors[row] = 0
+    tableau -= np.outer(factors, tableau[row])
+    basis[row] = col
+
+
+def simplex(tableau: Tableau, basis: list[int], allowed: int) -> None:
+    """Minimise the tableau's last row over its first `allowed` columns, by Bland's rule."""
+    while True:
+        entering = np.flatnonzero(tableau[-1, :allowed] < -EPS)
+        if not len(entering):
+            return
+        col = int(entering[0])
+        rows = np.flatnonzero(tableau[:-1, col] > EPS)
+        ratios = tableau[rows, -1] / tableau[rows, col]
+        ties = rows[ratios <= ratios.min() + EPS]
+        pivot(tableau, basis, min(ties.tolist(), key=basis.__getitem__), col)
+
+
+def relax(
+    effects: npt.NDArray[np.int64],
+    joltages: npt.NDArray[np.int64],
+    lower: npt.NDArray[np.int64],
+    upper: npt.NDArray[np.int64],
+) -> npt.NDArray[np.float64] | None:
+    """Solve the LP relaxation between press bounds, None when infeasible.
+
+    Presses are shifted to start at `lower`; the tableau columns are those
+    shifted presses, a slack per upper bound and an artificial per counter.
+    """
+    if (upper < lower).any():
+        return None
+    counters, n = effects.shape
+    rhs = joltages - effects @ lower
+    sign = np.where(rhs < 0, -1, 1)
+
+    tableau = np.zeros((counters + n + 1, 2 * n + counters + 1))
+    tableau[:counters, :n] = effects * sign[:, None]
+    tableau[:counters, 2 * n : -1] = np.eye(counters)
+    tableau[:counters, -1] = rhs * sign
+    tableau[counters:-1, :n] = tableau[counters:-1, n : 2 * n] = np.eye(n)
+    tableau[counters:-1, -1] = upper - lower
+    basis = [*range(2 * n, 2 * n + counters), *range(n, 2 * n)]
+
+    # phase 1: drive the artificials to zero
+    tableau[-1] = -tableau[:counters].sum(axis=0)
+    tableau[-1, 2 * n : -1] = 0
+    simplex(tableau, basis, 2 * n + counters)
+    if tableau[-1, -1] < -INTEGRAL_TOL:
+        return None
+    for row, col in enumerate(basis):
+        if col >= 2 * n:  # degenerate, swap it out before phase 2 can raise it
+            candidates = np.flatnonzero(np.abs(tableau[row, : 2 * n]) > EPS)
+            if len(candidates):
+                pivot(tableau, basis, row, int(candidates[0]))
+
+    # phase 2: fewest presses, artificials kept out
+    tableau[-1] = 0
+    tableau[-1, :n] = 1
+    for row, col in enumerate(basis):
+        tableau[-1] -= tableau[-1, col] * tableau[row]
+    simplex(tableau, basis, 2 * n)
+
+    values = np.zeros(tableau.shape[1])
+    values[basis] = tableau[:-1, -1]
+    return values[:n] + lower
+
+
+def solve_one(buttons: list[list[int]], joltages: tuple[int, ...]) -> int:
+    """Solve minimum button presses needed to achieve target joltages.
+
+    Branch and bound on the LP relaxation: prune a branch once its LP bound
+    can't beat the best exact solution, else split on its most fractional press.
+    Plain branching has no cuts, so a tree past `MAX_NODES` goes to CBC instead.
+    """
+    effects = np.zeros((len(joltages), len(buttons)), dtype=np.int64)
+    for i, button in enumerate(buttons):
+        effects[button, i] = 1
+    target = np.array(joltages, dtype=np.int64)
+    # a button can't be pressed more often than any counter it bumps allows
+    caps = np.array([min((joltages[i] for i in button), default=0) for button in buttons])
+
+    best = None
+    branches = [(np.zeros(len(buttons), dtype=np.int64), caps)]
+    for _ in range(MAX_NODES):
+        if not branches:
+            return 0 if best is None else best
+        lower, upper = branches.pop()
+        presses = relax(effects, target, lower, upper)
+        if presses is None or (
+            best is not None and math.ceil(presses.sum() - INTEGRAL_TOL) >= best
+        ):
+            continue
+
+        rounded = np.rint(presses).astype(np.int64)
+        fraction = np.abs(presses - rounded)
+        if fraction.max() < INTEGRAL_TOL and (effects @ rounded == target).all():
+            best = int(rounded.sum())
+            continue
+
+        i = int(fraction.argmax())
+        split = math.floor(presses[i])
+        below, above = upper.copy(), lower.copy()
+        below[i], above[i] = split, split + 1
+        down, up = (lower, below), (above, upper)
+        # depth first, into the side the LP leans towards
+        branches += [down, up] if presses[i] - split < 0.5 else [up, down]  # noqa: PLR2004
+
+    return cbc_solve_one(buttons, joltages)
+
+
+ENGINES: dict[str, Callable[[list[list[int]], tuple[int, ...]], int]] = {
+    'native': solve_one,
+    'cbc': cbc_solve_one,
+}
+
+
+def solve_line(line: str, engine: str = 'native') -> int:
+    _, buttons, joltages = parse_line(line)
+    return ENGINES[engine](buttons, joltages)
+
+
+def machine_key(line: str) -> str:
+    _, buttons, joltages = parse_line(line)
+    masks = sorted(sum(1 << i for i in button) for button in buttons)
+    return f'{masks}:{list(joltages)}'
+
+
+def compute_stream(
+    lines: Iterable[str],
+    engine: str = 'native',
+    workers: int = 1,
+    cache: support.SolutionCache | None = None,
+) -> int:
+    cache = support.SolutionCache() if cache is None else cache
+    solve = functools.partial(solve_line, engine=engine)
+    keyed = ((f'{engine}:{machine_key(line)}', line) for line in lines)
+    return sum(cache.map(solve, keyed, workers=workers))
+
+
+def compute(
+    s: str,
+    engine: str = 'native',
+    workers: int = 1,
+    cache: support.SolutionCache | None = None,
+) -> int:
+    return compute_stream(s.splitlines(), engine, workers, cache)
 
 
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
-    [(INPUT_S, EXPECTED)],
+    [
+        (INPUT_S, EXPECTED),
+        (INPUT_WIDE, EXPECTED_WIDE),
+        # billions of presses, where CBC's float tolerance comes out 2 short
+        (
+            (
+                '[.....] (0,1,2,3,4) (0,2) (3) (0,3,4) (0,1,2,3) '
+                '{1845416678,758245090,852913294,2466458792,1250100366}\n'
+            ),
+            2561126996,
+        ),
+    ],
 )
 def test(input_s: str, expected: int) -> None:
     assert compute(input_s) == expected
 
 
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize(
+    ('input_s', 'expected'),
+    [
+        # a counter at zero rules out every button on it
+        ('[....] (0,1) (1,2) (0,3) (2,3) (3) {0,7,7,30}\n', 37),
+        # large joltages, each machine needs 10**5+ presses
+        (
+            '[....] (0,2,3) (0,1) (0,1,2,3) (3) (1,2) (0,1,2,3) {144637,194769,133977,142406}\n',
+            253330,
+        ),
+        (
+            (
+                '[......] (0,1) (1) (0,1,2,3,4,5) (0) (0,1,2,3,4) (0,1,2,3,4,5) (0,1,3,4,5) '
+                '(0,1,3,5) (0) {3361790,2974441,1213899,1791352,1667728,1415908}\n'
+            ),
+            3361790,
+        ),
+        # plain branching wanders here for minutes, the native engine hands it to CBC
+        (
+            (
+                '[.###...#] (1,2,3,4,5,6,7) (4,5,6,7) (0,1,2,3,6) (1,4) (1) (2,5) (0,2) '
+                '(0,2,3,4,5,6,7) (1,3,5,6,7) (0,1,4,5) (1,3,4,6,7) (4,5,7) (0,1,4,5,6,7) '
+                '(1,2,4,5,6,7) (1,3,5,7) (0,1,2,6,7) '
+                '{13724718,40073684,23732127,22900910,45866288,47903062,37960409,44788764}\n'
+            ),
+            48193095,
+        ),
+    ],
+)
+def test_engines(engine: str, input_s: str, expected: int) -> None:
+    assert compute(input_s, engine) == expected
+
+
+def test_workers() -> None:
+    assert compute(INPUT_S, workers=2) == EXPECTED
+
+
+def test_cache(tmp_path: Path) -> None:
+    cache = support.SolutionCache(tmp_path / 'cache.json')
+    assert compute(INPUT_S * 2, cache=cache) == 2 * EXPECTED
+    assert len(cache) == len(INPUT_S.splitlines())
+    cache.save()
+
+    reloaded = support.SolutionCache(tmp_path / 'cache.json')
+    assert len(reloaded) == len(cache)
+    assert compute(INPUT_S, cache=reloaded) == EXPECTED
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    parser.add_argument('--engine', choices=ENGINES, default='native')
+    parser.add_argument('-j', '--workers', type=int, default=1)
+    parser.add_argument('--cache', action='store_true')
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
-    with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+    if args.bench:
+        support.run_bench(
+            args, compute, Path(args.data_file).read_text(), args.engine, args.workers
+        )
+        return 0
+
+    cache = support.SolutionCache(CACHE_FILE if args.cache else None)
+    with support.open_lines(args.data_file) as lines, support.timing():
+        print(compute_stream(lines, args.engine, args.workers, cache))
+    cache.save()
 
     return 0
 
@@ -1,4 +1,5 @@
 import argparse
+from collections.abc import Iterable
 from pathlib import Path
 
 import networkx as nx
@@ -26,19 +27,23 @@ EXPECTED = 5
 ParsedDict = dict[str, list[str]]
 
 
-def parse_to_dict(s: str) -> ParsedDict:
+def parse_to_dict(lines: Iterable[str]) -> ParsedDict:
     d: ParsedDict = {}
-    for line in s.splitlines():
+    for line in lines:
         name, others = line.split(': ')
         d[name] = others.split()
     return d
 
 
-def compute(s: str) -> int:
-    g = nx.DiGraph(parse_to_dict(s))
+def compute_stream(lines: Iterable[str]) -> int:
+    g = nx.DiGraph(parse_to_dict(lines))
     return sum(1 for _ in all_simple_paths(g, 'you', 'out'))
 
 
+def compute(s: str) -> int:
+    return compute_stream(s.splitlines())
+
+
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
@@ -51,10 +56,15 @@ def test(input_s: str, expected: int) -> None:
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
-    with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
+    with support.open_lines(args.data_file) as lines, support.timing():
+        print(compute_stream(lines))
 
     return 0
 
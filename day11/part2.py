@@ -1,5 +1,6 @@
 import argparse
 from collections import defaultdict
+from collections.abc import Iterable
 from pathlib import Path
 
 import networkx as nx
@@ -33,16 +34,16 @@ DAC_BIT = 2  # 0b10
 BOTH = FFT_BIT | DAC_BIT
 
 
-def parse_to_dict(s: str) -> ParsedDict:
+def parse_to_dict(lines: Iterable[str]) -> ParsedDict:
     d: ParsedDict = {}
-    for line in s.splitlines():
+    for line in lines:
         name, others = line.split(': ')
         d[name] = others.split()
     return d
 
 
-def compute(s: str) -> int:
-    g = nx.DiGraph(parse_to_dict(s))
+def compute_stream(lines: Iterable[str]) -> int:
+    g = nx.DiGraph(parse_to_dict(lines))
 
     def node_mask(n: str) -> int:
         m = 0
@@ -63,6 +64,10 @@ def compute(s: str) -> int:
     return ways['out'][BOTH]
 
 
+def compute(s: str) -> int:
+    return compute_stream(s.splitlines())
+
+
 # @pytest.mark.solved
 @pytest.mark.parametrize(
     ('input_s', 'expected'),
@@ -75,10 +80,15 @@ def test(input_s: str, expected: int) -> None:
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument('data_file', nargs='?', default=INPUT_TXT)
+    support.add_bench_arguments(parser)
     args = parser.parse_args()
 
-    with Path(args.data_file).open() as f, support.timing():
-        print(compute(f.read()))
+    if args.bench:
+        support.run_bench(args, compute, Path(args.data_file).read_text())
+        return 0
+
+    with support.open_lines(args.data_file) as lines, support.timing():
+        print(compute_stream(lines))
 
     return 0
 
@@ -3,46 +3,591 @@
 from __future__ import annotations
 
 import argparse
+import bisect
 import contextlib
 import enum
+import functools
+import gc
+import importlib
 import io
+import itertools
+import json
+import math
+import mmap
+import os
+import platform
 import re
 import shutil
+import signal
+import statistics
 import sys
 import time
+import tracemalloc
 import urllib.error
 import urllib.parse
 import urllib.request
+from collections import OrderedDict
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
 from dataclasses import dataclass
 from dataclasses import field
 from functools import total_ordering
 from pathlib import Path
 from typing import TYPE_CHECKING
+from typing import Literal
+
+import numpy as np
 
 if TYPE_CHECKING:
     from collections.abc import Callable
     from collections.abc import Generator
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from concurrent.futures import Future
+    from types import FrameType
+    from typing import Any
+
+    import numpy.typing as npt
 
 ENV_FILE = Path(__file__).parent.parent.parent / '.env'
 
 _MS_TO_US_THRESHOLD = 100
 
 
+def _format_ns(ns: float) -> str:
+    t = ns / 1_000_000
+    unit = 'ms'
+    if t < _MS_TO_US_THRESHOLD:
+        t *= 1000
+        unit = 'μs'
+    return f'{int(t)} {unit}'
+
+
 @contextlib.contextmanager
 def timing(name: str = '') -> Generator[None]:
-    before = time.time()
+    before = time.perf_counter_ns()
     try:
         yield
     finally:
-        after = time.time()
-        t = (after - before) * 1000
-        unit = 'ms'
-        if t < _MS_TO_US_THRESHOLD:
-            t *= 1000
-            unit = 'μs'
+        after = time.perf_counter_ns()
         if name:
             name = f' ({name})'
-        print(f'> {int(t)} {unit}{name}', file=sys.stderr, flush=True)
+        print(f'> {_format_ns(after - before)}{name}', file=sys.stderr, flush=True)
+
+
+# --- benchmarking
+
+BENCH_DEFAULT_WARMUP = 3
+_P95 = 0.95
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    name: str
+    repeats: int
+    warmup: int
+    min_ns: int
+    median_ns: float
+    p95_ns: int
+    max_ns: int
+    mean_ns: float
+    stddev_ns: float
+    answer: Any = None
+    timestamp: float = field(default_factory=time.time)
+    python: str = field(default_factory=platform.python_version)
+
+    @classmethod
+    def from_samples(
+        cls,
+        name: str,
+        samples_ns: list[int],
+        *,
+        warmup: int = 0,
+        answer: Any = None,  # noqa: ANN401
+    ) -> BenchResult:
+        if not samples_ns:
+            msg = 'at least one sample is required'
+            raise ValueError(msg)
+        ordered = sorted(samples_ns)
+        # nearest-rank percentile, exact for any number of samples
+        p95_idx = max(math.ceil(_P95 * len(ordered)) - 1, 0)
+        return cls(
+            name=name,
+            repeats=len(ordered),
+            warmup=warmup,
+            min_ns=ordered[0],
+            median_ns=statistics.median(ordered),
+            p95_ns=ordered[p95_idx],
+            max_ns=ordered[-1],
+            mean_ns=statistics.fmean(ordered),
+            stddev_ns=statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+            answer=answer,
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), default=str)
+
+    def __str__(self) -> str:
+        return (
+            f'> {self.name}: min {_format_ns(self.min_ns)}, '
+            f'median {_format_ns(self.median_ns)}, '
+            f'p95 {_format_ns(self.p95_ns)}, '
+            f'stddev {_format_ns(self.stddev_ns)} '
+            f'({self.repeats} runs, {self.warmup} warmup)'
+        )
+
+
+def _callable_name(fn: Callable[..., Any]) -> str:
+    code = getattr(fn, '__code__', None)
+    if code is None:
+        return getattr(fn, '__qualname__', repr(fn))
+    path = Path(code.co_filename)
+    return f'{path.parent.name}/{path.stem}'
+
+
+def bench(
+    fn: Callable[..., Any],
+    *args: Any,  # noqa: ANN401
+    repeats: int,
+    warmup: int = BENCH_DEFAULT_WARMUP,
+    name: str = '',
+) -> BenchResult:
+    """Time `fn(*args)` `repeats` times after `warmup` untimed calls."""
+    if repeats < 1:
+        msg = f'repeats must be positive, got {repeats}'
+        raise ValueError(msg)
+
+    answer = None
+    for _ in range(warmup):
+        answer = fn(*args)
+
+    samples = []
+    for _ in range(repeats):
+        before = time.perf_counter_ns()
+        answer = fn(*args)
+        samples.append(time.perf_counter_ns() - before)
+
+    return BenchResult.from_samples(
+        name or _callable_name(fn),
+        samples,
+        warmup=warmup,
+        answer=answer,
+    )
+
+
+def add_bench_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group('benchmark')
+    group.add_argument(
+        '--bench',
+        type=int,
+        default=0,
+        metavar='N',
+        help='time compute() N times and print a JSON record',
+    )
+    group.add_argument(
+        '--warmup',
+        type=int,
+        default=BENCH_DEFAULT_WARMUP,
+        metavar='N',
+        help='untimed runs before measuring (default: %(default)s)',
+    )
+    group.add_argument(
+        '--bench-out',
+        type=Path,
+        default=None,
+        metavar='FILE',
+        help='append the JSON record to FILE (JSON lines)',
+    )
+
+
+def run_bench(
+    args: argparse.Namespace,
+    fn: Callable[..., Any],
+    *fn_args: Any,  # noqa: ANN401
+) -> BenchResult:
+    result = bench(fn, *fn_args, repeats=args.bench, warmup=args.warmup)
+    print(result, file=sys.stderr, flush=True)
+    record = result.to_json()
+    print(record)
+    if args.bench_out is not None:
+        with Path.open(args.bench_out, 'a') as f:
+            print(record, file=f)
+    return result
+
+
+# --- repository-wide benchmark runner
+
+BENCH_BASELINE = Path('bench_baseline.json')
+BENCH_DEFAULT_REPEATS = 5
+BENCH_DEFAULT_THRESHOLD = 0.1
+BENCH_DEFAULT_TIMEOUT = 300.0
+_BYTES_IN_KIB = 1024
+
+
+@dataclass(frozen=True)
+class Solution:
+    day: str
+    part: str
+
+    @property
+    def name(self) -> str:
+        return f'{self.day}/{self.part}'
+
+    @property
+    def module(self) -> str:
+        return f'{self.day}.{self.part}'
+
+
+@dataclass
+class JobResult:
+    name: str
+    source: str = ''
+    status: str = 'ok'
+    error: str = ''
+    bench: BenchResult | None = None
+    peak_bytes: int | None = None
+    wall_s: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        d = asdict(self)
+        d['bench'] = asdict(self.bench) if self.bench else None
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> JobResult:
+        bench = BenchResult(**d['bench']) if d.get('bench') else None
+        return cls(**{**d, 'bench': bench})
+
+
+def discover_solutions(root: Path, days: list[str] | None = None) -> list[Solution]:
+    """Find every `dayNN/partN.py`, skipping the `day00` template."""
+    solutions: list[Solution] = []
+    for day_dir in sorted(root.glob('day[0-9][0-9]')):
+        if day_dir.name == 'day00' or (days and day_dir.name not in days):
+            continue
+        solutions.extend(
+            Solution(day_dir.name, part.stem) for part in sorted(day_dir.glob('part[0-9].py'))
+        )
+    return solutions
+
+
+def _example_case(module: Any) -> tuple[tuple[Any, ...], Any]:  # noqa: ANN401
+    """Take the first `@pytest.mark.parametrize` case of the module's `test`."""
+    for mark in getattr(module.test, 'pytestmark', ()):
+        if mark.name != 'parametrize':
+            continue
+        argnames, cases = mark.args
+        names = [n.strip() for n in argnames.split(',')] if isinstance(argnames, str) else argnames
+        case = dict(zip(names, cases[0], strict=True))
+        expected = case.pop('expected', None)
+        return tuple(case.values()), expected
+    msg = f'{module.__name__} has no parametrized example'
+    raise LookupError(msg)
+
+
+@contextlib.contextmanager
+def time_limit(seconds: float | None) -> Generator[None]:
+    """Raise `TimeoutError` in the main thread after `seconds`.
+
+    Relies on `SIGALRM`, so on platforms without it (Windows) no limit is enforced.
+    """
+    if not seconds or not hasattr(signal, 'SIGALRM'):
+        yield
+        return
+
+    def _raise(_signum: int, _frame: FrameType | None) -> None:
+        msg = f'timed out after {seconds:g}s'
+        raise TimeoutError(msg)
+
+    previous = signal.signal(signal.SIGALRM, _raise)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _peak_memory(fn: Callable[..., Any], *args: Any) -> int:  # noqa: ANN401
+    """Peak bytes allocated through Python during one untimed call of `fn`."""
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _format_bytes(n: float) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if n < _BYTES_IN_KIB:
+            return f'{n:.0f} {unit}'
+        n /= _BYTES_IN_KIB
+    return f'{n:.1f} GiB'
+
+
+def run_solution(
+    solution: Solution,
+    *,
+    repeats: int,
+    warmup: int,
+    timeout: float | None = None,
+    memory: bool = True,
+) -> JobResult:
+    result = JobResult(solution.name)
+    started = time.perf_counter()
+    try:
+        module = importlib.import_module(solution.module)
+        input_txt = Path(module.INPUT_TXT)
+        expected = None
+        if input_txt.exists():
+            result.source = 'input'
+            args: tuple[Any, ...] = (input_txt.read_text(),)
+        else:
+            result.source = 'example'
+            args, expected = _example_case(module)
+
+        gc.collect()
+        with time_limit(timeout):
+            result.bench = bench(
+                module.compute, *args, repeats=repeats, warmup=warmup, name=solution.name
+            )
+            if memory:
+                result.peak_bytes = _peak_memory(module.compute, *args)
+    except TimeoutError as e:
+        result.status = 'timeout'
+        result.error = str(e)
+    except Exception as e:  # noqa: BLE001
+        result.status = 'error'
+        result.error = f'{type(e).__name__}: {e}'
+    else:
+        if expected is not None and result.bench.answer != expected:
+            result.status = 'mismatch'
+            result.error = f'expected {expected!r}, got {result.bench.answer!r}'
+    result.wall_s = time.perf_counter() - started
+    return result
+
+
+def schedule_longest_first(
+    solutions: Iterable[Solution],
+    baseline: dict[str, JobResult],
+    *,
+    runs: int,
+) -> list[Solution]:
+    """Order jobs by their baseline median times the `runs` each will make, unknown ones first.
+
+    The median leaves out import and setup time, which a reused worker only
+    pays once and which says nothing about how long the solver itself runs.
+    """
+
+    def _known_cost(solution: Solution) -> float:
+        old = baseline.get(solution.name)
+        return old.bench.median_ns * runs if old and old.bench else math.inf
+
+    return sorted(solutions, key=_known_cost, reverse=True)
+
+
+def run_solutions(
+    solutions: list[Solution],
+    job: Callable[[Solution], JobResult],
+    *,
+    jobs: int,
+) -> list[JobResult]:
+    if jobs == 1:
+        return [job(solution) for solution in solutions]
+
+    # workers are reused, so numpy, pulp and friends are imported once per worker, not per job
+    by_name = {}
+    broken = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(job, solution): solution for solution in solutions}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                # a worker died (OOM kill, segfault) and took every pending job with it
+                broken.append(futures[future])
+                continue
+            print(f'  {result.name}: {result.status} ({result.wall_s:.2f}s)', file=sys.stderr)
+            by_name[result.name] = result
+
+    # rerun those on their own so only the job that crashes is blamed
+    for solution in broken:
+        result = _run_isolated(job, solution)
+        print(f'  {result.name}: {result.status} ({result.wall_s:.2f}s)', file=sys.stderr)
+        by_name[result.name] = result
+    return [by_name[solution.name] for solution in solutions]
+
+
+def _run_isolated(job: Callable[[Solution], JobResult], solution: Solution) -> JobResult:
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return executor.submit(job, solution).result()
+        except BrokenProcessPool as e:
+            return JobResult(
+                solution.name,
+                status='error',
+                error=f'{type(e).__name__}: worker died',
+                wall_s=time.perf_counter() - started,
+            )
+
+
+def load_baseline(path: Path) -> dict[str, JobResult]:
+    if not path.exists():
+        return {}
+    with Path.open(path) as f:
+        data = json.load(f)
+    return {name: JobResult.from_dict(d) for name, d in data['results'].items()}
+
+
+def save_baseline(path: Path, results: list[JobResult]) -> None:
+    data = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'timestamp': time.time(),
+        'results': {r.name: r.to_dict() for r in results},
+    }
+    with Path.open(path, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+        f.write('\n')
+
+
+def compare_to_baseline(
+    result: JobResult,
+    baseline: dict[str, JobResult],
+    threshold: float,
+) -> tuple[float | None, bool]:
+    """Return the relative median change and whether it is a regression."""
+    old = baseline.get(result.name)
+    if result.bench is None or old is None or old.bench is None or old.source != result.source:
+        return None, False
+    change = result.bench.median_ns / old.bench.median_ns - 1
+    return change, change > threshold
+
+
+def format_results_table(
+    results: list[JobResult],
+    baseline: dict[str, JobResult],
+    threshold: float,
+) -> str:
+    header = (
+        'solution',
+        'input',
+        'min',
+        'median',
+        'p95',
+        'memory',
+        'baseline',
+        'change',
+        'status',
+    )
+    rows = [header]
+    for r in results:
+        change, regressed = compare_to_baseline(r, baseline, threshold)
+        old = baseline.get(r.name)
+        status = r.status if r.status != 'ok' else ('REGRESSION' if regressed else 'ok')
+        rows.append(
+            (
+                r.name,
+                r.source,
+                _format_ns(r.bench.min_ns) if r.bench else '-',
+                _format_ns(r.bench.median_ns) if r.bench else '-',
+                _format_ns(r.bench.p95_ns) if r.bench else '-',
+                _format_bytes(r.peak_bytes) if r.peak_bytes is not None else '-',
+                _format_ns(old.bench.median_ns) if old and old.bench else '-',
+                f'{change:+.1%}' if change is not None else '-',
+                f'{status} ({r.error})' if r.error else status,
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header) - 1)]
+    return '\n'.join(
+        '  '.join((*(cell.ljust(w) for cell, w in zip(row[:-1], widths, strict=True)), row[-1]))
+        for row in rows
+    )
+
+
+def bench_all() -> int:
+    parser = argparse.ArgumentParser(description='benchmark every dayNN/partN.py compute()')
+    parser.add_argument('days', nargs='*', help='only run these days, e.g. day01 day08')
+    parser.add_argument('--repeats', type=int, default=BENCH_DEFAULT_REPEATS)
+    parser.add_argument('--warmup', type=int, default=BENCH_DEFAULT_WARMUP)
+    parser.add_argument('--baseline', type=Path, default=BENCH_BASELINE)
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=BENCH_DEFAULT_THRESHOLD,
+        help='flag median slowdowns above this fraction (default: %(default)s)',
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='worker processes, 1 runs everything in-process (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=BENCH_DEFAULT_TIMEOUT,
+        help='seconds allowed per solution, 0 disables (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--no-memory',
+        dest='memory',
+        action='store_false',
+        help='skip the extra traced run that measures peak memory',
+    )
+    parser.add_argument(
+        '--update-baseline',
+        action='store_true',
+        help='overwrite the baseline with this run',
+    )
+    args = parser.parse_args()
+
+    root = Path.cwd()
+    sys.path.insert(0, str(root))
+
+    baseline = load_baseline(args.baseline)
+    solutions = schedule_longest_first(
+        discover_solutions(root, args.days),
+        baseline,
+        runs=args.warmup + args.repeats + args.memory,
+    )
+
+    started = time.perf_counter()
+    job = functools.partial(
+        run_solution,
+        repeats=args.repeats,
+        warmup=args.warmup,
+        timeout=args.timeout,
+        memory=args.memory,
+    )
+    results = run_solutions(solutions, job, jobs=args.jobs)
+    elapsed = time.perf_counter() - started
+    results.sort(key=lambda r: r.name)
+
+    print(format_results_table(results, baseline, args.threshold))
+    print(
+        f'\n{len(results)} solutions in {elapsed:.2f}s wall, '
+        f'{sum(r.wall_s for r in results):.2f}s total job time'
+    )
+
+    if not baseline or args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f'\nbaseline written to {args.baseline}')
+
+    failed = sum(r.status != 'ok' for r in results)
+    regressed = sum(compare_to_baseline(r, baseline, args.threshold)[1] for r in results)
+    if failed or regressed:
+        print(f'\n{failed} failed, {regressed} regressed', file=sys.stderr)
+        return 1
+    return 0
 
 
 def _get_cookie_headers() -> dict[str, str]:
@@ -191,6 +736,92 @@ def new_day() -> None:
     print(' Finished '.center(50, '-'))
 
 
+# --- streaming input
+
+
+def iter_lines(f: Iterable[str]) -> Generator[str]:
+    """Yield lines of a text file object (or any iterable) without line endings."""
+    for line in f:
+        yield line.rstrip('\r\n')
+
+
+def iter_records(buf: bytes | bytearray | mmap.mmap, sep: bytes = b'\n') -> Generator[memoryview]:
+    """Yield `sep` separated records of `buf` as zero-copy views, without `sep`.
+
+    Views keep `buf` exported, release them before closing an `mmap`.
+    """
+    with memoryview(buf) as view:
+        start, end = 0, len(buf)
+        while start < end:
+            stop = buf.find(sep, start)
+            if stop == -1:
+                stop = end
+            yield view[start:stop]
+            start = stop + len(sep)
+
+
+def _iter_mmap_lines(m: mmap.mmap) -> Generator[str]:
+    for record in iter_records(m):
+        with record:
+            yield record.tobytes().rstrip(b'\r').decode()
+
+
+@contextlib.contextmanager
+def open_lines(path: str | os.PathLike[str], *, use_mmap: bool = False) -> Generator[Iterator[str]]:
+    """Open `path` and hand out its lines one at a time, never the whole contents.
+
+    Lines come from a buffered file by default, or from an `mmap` of it.
+    """
+    with Path(path).open('rb' if use_mmap else 'r') as f:
+        if not use_mmap:
+            yield iter_lines(f)
+            return
+
+        if Path(path).stat().st_size == 0:  # can't mmap an empty file
+            yield iter(())
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            lines = _iter_mmap_lines(m)
+            try:
+                yield lines
+            finally:
+                lines.close()
+
+
+def _map_chunk[T, R](fn: Callable[[T], R], chunk: tuple[T, ...]) -> list[R]:
+    return [fn(item) for item in chunk]
+
+
+def parallel_map[T, R](
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    workers: int = 1,
+    chunksize: int = 16,
+    chunks_per_worker: int = 4,
+) -> Generator[R]:
+    """Map `fn` over `items` in order, across `workers` processes when > 1.
+
+    One pool serves the whole stream. Items go to it `chunksize` at a time to
+    amortise pickling and IPC per task, with up to `chunks_per_worker` chunks
+    per worker in flight, so workers keep busy past a slow item while `items`
+    is only read that far ahead.
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight: deque[Future[list[R]]] = deque()
+        for chunk in itertools.batched(items, chunksize, strict=False):
+            in_flight.append(executor.submit(_map_chunk, fn, chunk))
+            if len(in_flight) >= workers * chunks_per_worker:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
 # --- helper functions and classes
 
 
@@ -209,6 +840,190 @@ def adjacent_8(x: int, y: int) -> Generator[tuple[int, int]]:
             yield x + x_d, y + y_d
 
 
+_OFFSETS_4 = ((0, -1), (1, 0), (0, 1), (-1, 0))
+_OFFSETS_8 = tuple((dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy)
+
+
+def adjacent_counts(
+    mask: npt.NDArray[np.bool_],
+    *,
+    connectivity: Literal[4, 8] = 8,
+) -> npt.NDArray[np.uint8]:
+    """Count set neighbours of every cell of a 2D boolean `mask` (`[y, x]`) at once.
+
+    Cells outside the mask count as unset, same as skipping `KeyError`s
+    from `adjacent_4` / `adjacent_8` lookups.
+    """
+    offsets = _OFFSETS_8 if connectivity == 8 else _OFFSETS_4  # noqa: PLR2004
+    height, width = mask.shape
+    padded = np.pad(mask, 1).view(np.uint8)
+    counts = np.zeros((height, width), dtype=np.uint8)
+    for dx, dy in offsets:
+        counts += padded[1 + dy : 1 + dy + height, 1 + dx : 1 + dx + width]
+    return counts
+
+
+def pair_sq_distances(
+    points: npt.NDArray[np.int64],
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[np.int64]]:
+    """Squared distance of every pair `i < j` of `points` (n x dims), condensed.
+
+    Built block by block, so beyond the 24 bytes per pair of output only about
+    `NEAREST_PAIRS_BLOCK_BYTES` of temporaries are alive at once.
+    """
+    blocks = list(_pair_blocks(points, NEAREST_PAIRS_BLOCK_BYTES))
+    if not blocks:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, np.empty(0, dtype=np.int64)
+    i, j, dist2 = map(np.concatenate, zip(*blocks, strict=True))
+    return i, j, dist2
+
+
+NEAREST_PAIRS_BATCH = 1 << 16
+NEAREST_PAIRS_MAX_BATCH = 1 << 22
+NEAREST_PAIRS_BLOCK_BYTES = 32 << 20
+
+
+def _pair_block_dist2(
+    points: npt.NDArray[np.int64],
+    block_bytes: int,
+) -> Generator[tuple[int, npt.NDArray[np.int64], npt.NDArray[np.bool]]]:
+    """Squared distances from row blocks of `points` to every later point.
+
+    Yields `(start, dist2, upper)` where `dist2[r, c]` is between points
+    `start + r` and `start + 1 + c`, and `upper` masks the pairs with `i < j`.
+    """
+    n, dims = points.shape
+    # the diff cube dominates: rows * n * dims int64s, plus the distance block and masks
+    rows = max(1, block_bytes // (8 * (dims + 3) * max(n, 1)))
+    for start in range(0, n - 1, rows):
+        stop = min(start + rows, n - 1)
+        diff = points[start:stop, np.newaxis, :] - points[np.newaxis, start + 1 :, :]
+        dist2 = np.einsum('ijk,ijk->ij', diff, diff)
+        upper = np.arange(start + 1, n) > np.arange(start, stop)[:, np.newaxis]
+        yield start, dist2, upper
+
+
+def _pair_blocks(
+    points: npt.NDArray[np.int64],
+    block_bytes: int,
+) -> Generator[tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[np.int64]]]:
+    """`pair_sq_distances` in row blocks sized to about `block_bytes` of temporaries."""
+    for start, dist2, upper in _pair_block_dist2(points, block_bytes):
+        i, j = np.nonzero(upper)
+        yield i + start, j + start + 1, dist2[i, j]
+
+
+def closest_pairs(
+    points: npt.NDArray[np.int64],
+    k: int,
+    *,
+    block_bytes: int = NEAREST_PAIRS_BLOCK_BYTES,
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[np.int64]]:
+    """Find the `k` closest pairs `(i, j, dist2)` of `points` in one blocked scan, unordered.
+
+    Each block is cut back to its best `k` candidates, so peak memory is about
+    `block_bytes + 48 * k` bytes. Ties on the cut-off distance are broken arbitrarily.
+    """
+    best_i = best_j = np.empty(0, dtype=np.intp)
+    best_dist2 = np.empty(0, dtype=np.int64)
+    for i, j, dist2 in _pair_blocks(points, block_bytes):
+        best_i, best_j = np.concatenate((best_i, i)), np.concatenate((best_j, j))
+        best_dist2 = np.concatenate((best_dist2, dist2))
+        if len(best_dist2) > k:
+            keep = np.argpartition(best_dist2, k - 1)[:k]
+            best_i, best_j, best_dist2 = best_i[keep], best_j[keep], best_dist2[keep]
+    return best_i, best_j, best_dist2
+
+
+def nearest_pairs(
+    points: npt.NDArray[np.int64],
+    *,
+    batch_size: int = NEAREST_PAIRS_BATCH,
+    max_batch_size: int = NEAREST_PAIRS_MAX_BATCH,
+    block_bytes: int = NEAREST_PAIRS_BLOCK_BYTES,
+) -> Generator[tuple[int, int, int]]:
+    """Yield `(dist2, i, j)` for all pairs `i < j` of `points`, closest first.
+
+    The pairs are never materialised: each batch rescans the distances block by
+    block, first for just the distances to find the `batch_size`-th smallest
+    above the last batch, then to collect everything up to it. `batch_size`
+    doubles after each batch up to `max_batch_size`, so a consumer that takes
+    most pairs costs O(n^2) per `max_batch_size` pairs rather than per the first
+    batch. Peak memory is about `block_bytes + 24 * max_batch_size` bytes (more
+    only when many pairs tie on the cut-off distance). Ties are ordered by `(i, j)`.
+    """
+    lowest = -1
+    while True:
+        # 1. the batch_size smallest distances still to come
+        smallest = np.empty(0, dtype=np.int64)
+        for _, dist2, upper in _pair_block_dist2(points, block_bytes):
+            wanted = upper & (dist2 > lowest)
+            if len(smallest) == batch_size:
+                wanted &= dist2 < smallest.max()
+            candidates = np.concatenate((smallest, dist2[wanted]))
+            if len(candidates) > batch_size:
+                candidates = np.partition(candidates, batch_size - 1)[:batch_size]
+            smallest = candidates
+        if not len(smallest):
+            return
+        cutoff = int(smallest.max())
+
+        # 2. every pair up to that cut-off, ties included
+        batch_i, batch_j, batch_dist2 = [], [], []
+        for start, dist2, upper in _pair_block_dist2(points, block_bytes):
+            i, j = np.nonzero(upper & (dist2 > lowest) & (dist2 <= cutoff))
+            batch_i.append(i + start)
+            batch_j.append(j + start + 1)
+            batch_dist2.append(dist2[i, j])
+        i, j, dist2 = map(np.concatenate, (batch_i, batch_j, batch_dist2))
+        order = np.lexsort((j, i, dist2))
+        for at in range(0, len(order), NEAREST_PAIRS_BATCH):  # few Python ints at a time
+            part = order[at : at + NEAREST_PAIRS_BATCH]
+            yield from zip(dist2[part].tolist(), i[part].tolist(), j[part].tolist(), strict=True)
+        lowest = cutoff
+        batch_size = min(2 * batch_size, max(batch_size, max_batch_size))
+
+
+def largest_subsequence_number(digits: bytes | bytearray | memoryview, k: int) -> int:
+    """Return the largest `k` digit number that is a subsequence of ASCII `digits`.
+
+    A monotonic stack pops every digit a larger later one can replace while
+    there are still digits to spare, so it is a single O(n) pass.
+    """
+    view = memoryview(digits)
+    n = len(view)
+    if not 0 < k <= n:
+        msg = f'cannot pick {k} digits out of {n}'
+        raise ValueError(msg)
+
+    drop = n - k
+    stack = bytearray()
+    for idx, digit in enumerate(view):
+        while drop and stack and stack[-1] < digit:
+            stack.pop()
+            drop -= 1
+        if not drop:
+            stack += view[idx:]
+            break
+        stack.append(digit)
+
+    # int() refuses strings past sys.get_int_max_str_digits(), so go in chunks
+    value = 0
+    for start in range(0, k, 4000):
+        chunk = stack[start : min(start + 4000, k)]
+        value = value * 10 ** len(chunk) + int(chunk)
+    return value
+
+
+def char_matrix(lines: Iterable[str]) -> npt.NDArray[np.uint8]:
+    """Pad `lines` with spaces into a (rows, width) matrix of their ASCII codes."""
+    rows = [line.encode() for line in lines]
+    width = max(map(len, rows), default=0)
+    buf = b''.join(row.ljust(width) for row in rows)
+    return np.frombuffer(buf, dtype=np.uint8).reshape(len(rows), width)
+
+
 def parse_coords_char(s: str) -> dict[tuple[int, int], str]:
     coords = {}
     for y, line in enumerate(s.splitlines()):
@@ -313,7 +1128,7 @@ class Pointer:
     x: int = 0
     y: int = 0
     direction: Direction4 | None = None
-    grid: Grid = field(init=False, repr=False)
+    grid: Grid | DenseGrid = field(init=False, repr=False)
 
     def move(self, n: int = 1) -> Pointer:
         if not self.direction:
@@ -442,3 +1257,378 @@ class Grid(dict):
                     print(self[(x, y)], end='', file=s_buff)
                 print(file=s_buff)
             return s_buff.getvalue()
+
+
+class DenseGrid(Mapping[tuple[int, int], str]):
+    """Rectangular grid of single characters stored row-major in a flat `bytearray`.
+
+    Reads like `Grid` (`grid[(x, y)]`, `get`, `items`, ...), out of bounds
+    coordinates raise `KeyError`. Unlike `Grid`, `width` and `height` are the
+    real dimensions and cells can only be overwritten, not deleted.
+    """
+
+    __slots__ = ('cells', 'height', 'pointers', 'width')
+
+    def __init__(self, width: int, height: int, cells: bytearray | None = None) -> None:
+        if cells is None:
+            cells = bytearray(b'.' * (width * height))
+        if len(cells) != width * height:
+            msg = f'expected {width * height} cells, got {len(cells)}'
+            raise ValueError(msg)
+        self.width = width
+        self.height = height
+        self.cells = cells
+        self.pointers: set[Pointer] = set()
+
+    @classmethod
+    def from_string(cls, s: str) -> DenseGrid:
+        lines = s.splitlines()
+        width = len(lines[0]) if lines else 0
+        if any(len(line) != width for line in lines):
+            msg = 'all grid rows must have the same width'
+            raise ValueError(msg)
+        return cls(width, len(lines), bytearray(''.join(lines).encode('ascii')))
+
+    def index(self, x: int, y: int) -> int:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        raise KeyError((x, y))
+
+    def coords(self, i: int) -> tuple[int, int]:
+        y, x = divmod(i, self.width)
+        return x, y
+
+    def add_pointers(self, *pointers: Pointer) -> None:
+        for pointer in pointers:
+            pointer.grid = self
+            self.pointers.add(pointer)
+
+    @property
+    def pointer(self) -> Pointer:
+        return min(self.pointers)
+
+    def count(self, value: str) -> int:
+        return self.cells.count(ord(value))
+
+    def as_array(self) -> npt.NDArray[np.uint8]:
+        """Zero-copy `[y, x]` view of the cells as byte values."""
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.height, self.width)
+
+    def mask(self, value: str) -> npt.NDArray[np.bool_]:
+        return self.as_array() == ord(value)
+
+    def __getitem__(self, coord: tuple[int, int]) -> str:
+        return chr(self.cells[self.index(*coord)])
+
+    def __setitem__(self, coord: tuple[int, int], value: str) -> None:
+        self.cells[self.index(*coord)] = ord(value)
+
+    def get[T](self, coord: tuple[int, int], default: T | None = None) -> str | T | None:  # type: ignore[override]
+        x, y = coord
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return chr(self.cells[y * self.width + x])
+        return default
+
+    def __contains__(self, coord: object) -> bool:
+        match coord:
+            case (int(x), int(y)):
+                return 0 <= x < self.width and 0 <= y < self.height
+            case _:
+                return False
+
+    def __iter__(self) -> Generator[tuple[int, int]]:
+        for y in range(self.height):
+            for x in range(self.width):
+                yield x, y
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __str__(self) -> str:
+        rows = (
+            self.cells[y * self.width : (y + 1) * self.width].decode() for y in range(self.height)
+        )
+        return ''.join(f'{row}\n' for row in rows)
+
+
+class IntervalSet:
+    """Union of inclusive integer intervals, merged once into parallel sorted lists."""
+
+    __slots__ = ('ends', 'starts')
+
+    def __init__(self, intervals: Iterable[tuple[int, int]]) -> None:
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        for start, end in sorted(intervals):
+            if start > end:
+                msg = f'interval ends before it starts: {start}-{end}'
+                raise ValueError(msg)
+            if self.ends and start <= self.ends[-1] + 1:
+                # overlaps or touches the previous interval
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    @classmethod
+    def from_string(cls, s: str) -> IntervalSet:
+        """Parse one `start-end` interval per line."""
+        intervals = []
+        for line in s.splitlines():
+            start, end = line.split('-')
+            intervals.append((int(start), int(end)))
+        return cls(intervals)
+
+    def __contains__(self, n: object) -> bool:
+        if not isinstance(n, int):
+            return False
+        i = bisect.bisect_right(self.starts, n) - 1
+        return i >= 0 and n <= self.ends[i]
+
+    def contains_many(self, values: npt.ArrayLike) -> npt.NDArray[np.bool_]:
+        """Vectorized `in` for a batch of values."""
+        values = np.asarray(values, dtype=np.int64)
+        if not self.starts:
+            return np.zeros(values.shape, dtype=np.bool_)
+        starts = np.asarray(self.starts, dtype=np.int64)
+        ends = np.asarray(self.ends, dtype=np.int64)
+        i = np.searchsorted(starts, values, side='right') - 1
+        return (i >= 0) & (values <= ends[np.maximum(i, 0)])
+
+    @property
+    def size(self) -> int:
+        """Count of integers covered."""
+        return sum(end - start + 1 for start, end in self)
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return zip(self.starts, self.ends, strict=True)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self)})'
+
+
+class UnionFind:
+    """Disjoint sets over `0..n-1`, with path halving and union by size."""
+
+    __slots__ = ('components', 'parent', 'size')
+
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+        self.size = [1] * n
+        self.components = n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets of `a` and `b`, False if they already were one."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.components -= 1
+        return True
+
+    def component_sizes(self) -> list[int]:
+        return [self.size[x] for x in range(len(self.parent)) if self.parent[x] == x]
+
+
+GRID_PAIRS_BUDGET = 1 << 20
+
+
+class GridIndex:
+    """Integer points bucketed into a uniform grid of `cell` sized cubes.
+
+    Any two points at most `cell` apart sit in the same or adjacent cells, so
+    fixed-radius pair queries only look at neighbouring buckets.
+    """
+
+    __slots__ = ('cell', 'cell_counts', 'cell_ids', 'cell_starts', 'order', 'points', 'strides')
+
+    def __init__(self, points: npt.NDArray[np.int64], cell: int) -> None:
+        self.points = points
+        self.cell = cell
+        keys = points // cell
+        # one spare cell on each side so neighbour ids never wrap around
+        keys = keys - keys.min(axis=0) + 1
+        spans = keys.max(axis=0) + 2
+        self.strides = np.cumprod(np.concatenate(([1], spans[:-1])))
+        ids = keys @ self.strides
+        self.order = np.argsort(ids, kind='stable')
+        self.cell_ids, self.cell_starts, self.cell_counts = np.unique(
+            ids[self.order], return_index=True, return_counts=True
+        )
+
+    def pairs_within(
+        self,
+        radius: int,
+        labels: npt.NDArray[np.intp] | None = None,
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[np.int64]]:
+        """All pairs `i < j` with squared distance <= `radius`^2, as `(i, j, dist2)`.
+
+        With `labels`, pairs whose points share a label are skipped.
+        """
+        chunks = list(self.iter_pairs_within(radius, labels))
+        if not chunks:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty.copy(), np.zeros(0, dtype=np.int64)
+        i, j, dist2 = (np.concatenate(parts) for parts in zip(*chunks, strict=True))
+        return i, j, dist2
+
+    def iter_pairs_within(
+        self,
+        radius: int,
+        labels: npt.NDArray[np.intp] | None = None,
+        *,
+        max_pairs: int = GRID_PAIRS_BUDGET,
+    ) -> Generator[tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[np.int64]]]:
+        """Yield the pairs of `pairs_within` in chunks of about `max_pairs` candidates.
+
+        Members of each cell are grouped by label and only paired with the
+        neighbouring members outside their own label, so a crowded cell of one
+        label costs nothing however many points it holds.
+        """
+        if radius > self.cell:
+            msg = f'radius {radius} is larger than the cell size {self.cell}'
+            raise ValueError(msg)
+
+        n = len(self.points)
+        # dense labels, every point its own when none are given
+        dense = np.arange(n) if labels is None else np.unique(labels, return_inverse=True)[1]
+        cell_of = np.repeat(np.arange(len(self.cell_ids)), self.cell_counts)
+        order = self.order[np.lexsort((dense[self.order], cell_of))]
+        # sorted, so each (cell, label) run is found by binary search
+        run_keys = cell_of * n + dense[order]
+
+        for offset in itertools.product((-1, 0, 1), repeat=self.points.shape[1]):
+            # pair every occupied cell with its neighbour at this offset
+            neighbour_ids = self.cell_ids + np.dot(offset, self.strides)
+            at = np.searchsorted(self.cell_ids, neighbour_ids)
+            at[at == len(self.cell_ids)] = 0
+            occupied = np.flatnonzero(self.cell_ids[at] == neighbour_ids)
+            counts = self.cell_counts[occupied]
+
+            # each member of a cell, against the neighbour cell minus its own label's run
+            first = np.cumsum(counts) - counts
+            member = np.repeat(self.cell_starts[occupied] - first, counts) + np.arange(counts.sum())
+            other = np.repeat(at[occupied], counts)
+            run_key = other * n + dense[order[member]]
+            run_lo = np.searchsorted(run_keys, run_key, side='left')
+            run_hi = np.searchsorted(run_keys, run_key, side='right')
+            other_start = self.cell_starts[other]
+            other_end = other_start + self.cell_counts[other]
+
+            owners = np.concatenate((member, member))
+            starts = np.concatenate((other_start, run_hi))
+            sizes = np.concatenate((run_lo - other_start, other_end - run_hi))
+            keep = sizes > 0
+            owners, starts, sizes = owners[keep], starts[keep], sizes[keep]
+
+            ends = np.cumsum(sizes)
+            lo = 0
+            while lo < len(sizes):
+                done = ends[lo] - sizes[lo]
+                hi = max(lo + 1, int(np.searchsorted(ends, done + max_pairs, side='right')))
+                yield self._range_pairs(order, owners[lo:hi], starts[lo:hi], sizes[lo:hi], radius)
+                lo = hi
+
+    def _range_pairs(
+        self,
+        order: npt.NDArray[np.intp],
+        owners: npt.NDArray[np.intp],
+        starts: npt.NDArray[np.intp],
+        sizes: npt.NDArray[np.intp],
+        radius: int,
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[np.int64]]:
+        """Pairs within `radius` of each owner with its run of sorted members."""
+        first = np.cumsum(sizes) - sizes
+        i = order[np.repeat(owners, sizes)]
+        j = order[np.repeat(starts - first, sizes) + np.arange(sizes.sum())]
+        keep = i < j
+        i, j = i[keep], j[keep]
+        diff = self.points[i] - self.points[j]
+        dist2 = np.einsum('ij,ij->i', diff, diff)
+        close = dist2 <= radius * radius
+        return i[close], j[close], dist2[close]
+
+
+def _solve_marked[T, R](fn: Callable[[T], R], marked: tuple[bool, T]) -> R | None:
+    solve, item = marked
+    return fn(item) if solve else None
+
+
+class SolutionCache:
+    """LRU of solved results by key, optionally persisted as JSON at `path`."""
+
+    def __init__(self, path: Path | None = None, maxsize: int = 1 << 16) -> None:
+        self.path = path
+        self.maxsize = maxsize
+        self._results: OrderedDict[str, Any] = OrderedDict()
+        if path is not None and path.exists():
+            with path.open() as f:
+                for key, value in json.load(f).items():
+                    self[key] = value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._results
+
+    def __getitem__(self, key: str) -> Any:  # noqa: ANN401
+        self._results.move_to_end(key)
+        return self._results[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:  # noqa: ANN401
+        self._results[key] = value
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self.path.open('w') as f:
+            json.dump(self._results, f)
+
+    def map[T](
+        self,
+        fn: Callable[[T], Any],
+        keyed: Iterable[tuple[str, T]],
+        *,
+        workers: int = 1,
+    ) -> Generator[Any]:
+        """Yield `fn(item)` for each `(key, item)`, solving each uncached key once.
+
+        Everything streams through one `parallel_map`, uncached items marked
+        to be solved, so results come out in order with memory bounded by how
+        far the pool reads ahead rather than by the length of `keyed`.
+        """
+        ahead: deque[tuple[str, bool]] = deque()  # read but not yet yielded
+        solving: set[str] = set()
+
+        def marked() -> Generator[tuple[bool, T]]:
+            for key, item in keyed:
+                solve = key not in self and key not in solving
+                if solve:
+                    solving.add(key)
+                ahead.append((key, solve))
+                yield solve, item
+
+        solve_marked = functools.partial(_solve_marked, fn)
+        for value in parallel_map(solve_marked, marked(), workers=workers):
+            key, solved = ahead.popleft()
+            if solved:
+                self[key] = value
+                solving.discard(key)
+            yield self[key]